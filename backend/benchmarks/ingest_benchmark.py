@@ -0,0 +1,182 @@
+"""Catalog ingestion benchmarks.
+
+Run from the backend directory:
+
+    python -m benchmarks.ingest_benchmark --save-baseline
+    python -m benchmarks.ingest_benchmark --output results.json
+
+Runs are compared against benchmarks/baseline.json when it exists, and
+the exit status is non-zero if any timing regressed past the threshold.
+Without --mongo-url the catalog is written to an in-memory mongomock
+database, which measures parsing and pipeline overhead rather than real
+Mongo write cost.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from services.catalog_snapshot import build_snapshot
+from services.fzp_parser import parse_fzp_file, ingest_fzp_file
+from services.part_service import PartService
+
+DEFAULT_PARTS_ROOT = Path(__file__).resolve().parents[2] / "public" / "parts"
+BENCHMARK_DB = "fritzing_benchmark"
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize per-file timings in milliseconds"""
+    ordered = sorted(samples)
+    def pick(fraction):
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0
+    }
+
+def time_per_file(fn: Callable[[str], Any], fzp_files: List[Path]) -> Dict[str, float]:
+    samples = []
+    for fzp_file in fzp_files:
+        start = time.perf_counter()
+        fn(str(fzp_file))
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+async def time_call(coro) -> Dict[str, Any]:
+    start = time.perf_counter()
+    report = await coro
+    return {"seconds": time.perf_counter() - start, "parts_loaded": report.parts_loaded}
+
+def open_collection(mongo_url: str):
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(mongo_url)
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("mongomock-motor is not installed; pass --mongo-url to benchmark against a real Mongo")
+    return AsyncMongoMockClient()
+
+async def run_benchmarks(parts_root: Path, mongo_url: str) -> Dict[str, Any]:
+    fzp_files = PartService.scan_fzp_files(parts_root)
+    if not fzp_files:
+        sys.exit(f"No .fzp or .fzpz files found under {parts_root}; pass --parts-root to point at the parts library")
+    results: Dict[str, Any] = {}
+    
+    print(f"Timing parse_fzp_file over {len(fzp_files)} files...")
+    results["parse_fzp_file"] = time_per_file(parse_fzp_file, fzp_files)
+    print("Timing ingest_fzp_file (parse, fingerprint and connector geometry)...")
+    results["ingest_fzp_file"] = time_per_file(lambda path: ingest_fzp_file(path, str(parts_root)), fzp_files)
+    
+    client = open_collection(mongo_url)
+    await client.drop_database(BENCHMARK_DB)
+    try:
+        service = PartService(client[BENCHMARK_DB].fritzing_parts)
+        service.fritzing_parts_path = parts_root
+        service.snapshot_path = None
+        await service.ensure_indexes()
+        
+        print("Timing full load into an empty catalog...")
+        results["load_full"] = await time_call(service.load_fritzing_parts())
+        print("Timing forced reload...")
+        results["load_forced"] = await time_call(service.load_fritzing_parts(force_reload=True))
+        print("Timing incremental reload with no changes...")
+        results["load_incremental"] = await time_call(service.load_fritzing_parts(incremental=True))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_path = Path(tmp) / "catalog_snapshot.bin"
+            print("Timing snapshot build...")
+            start = time.perf_counter()
+            build_snapshot(parts_root, fzp_files, snapshot_path)
+            results["snapshot_build"] = {"seconds": time.perf_counter() - start}
+            print("Timing forced reload from snapshot...")
+            service.snapshot_path = snapshot_path
+            results["load_snapshot"] = await time_call(service.load_fritzing_parts(force_reload=True))
+    finally:
+        await client.drop_database(BENCHMARK_DB)
+    
+    return results
+
+def metric_values(results: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten results to the timings that are compared against a baseline"""
+    values = {}
+    for name, result in results.items():
+        for key in ("seconds", "p50_ms", "p95_ms", "max_ms"):
+            if key in result:
+                values[f"{name}.{key}"] = result[key]
+    return values
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Compare timings against a baseline run; ratios above the threshold are regressions"""
+    current = metric_values(results)
+    previous = metric_values(baseline.get("results", {}))
+    comparison = {}
+    for name, value in current.items():
+        if name not in previous or previous[name] <= 0:
+            continue
+        ratio = value / previous[name]
+        comparison[name] = {
+            "baseline": previous[name],
+            "current": value,
+            "ratio": ratio,
+            "regression": ratio > threshold
+        }
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog ingestion over the parts library")
+    parser.add_argument("--parts-root", type=Path, default=DEFAULT_PARTS_ROOT)
+    parser.add_argument("--mongo-url", default=os.environ.get("BENCHMARK_MONGO_URL", ""))
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="earlier results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also store these results in the --baseline file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run_benchmarks(args.parts_root, args.mongo_url))
+    output = {
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parts_root": str(args.parts_root),
+            "mongo": "mongodb" if args.mongo_url else "mongomock"
+        },
+        "results": results
+    }
+    
+    regressions = []
+    if args.baseline and args.baseline.exists():
+        with open(args.baseline) as f:
+            output["comparison"] = compare(results, json.load(f), args.threshold)
+        regressions = [name for name, entry in output["comparison"].items() if entry["regression"]]
+    
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(output, f, indent=2)
+    
+    for name, value in metric_values(results).items():
+        print(f"{name:40} {value:12.3f}")
+    print(f"Wrote {args.output}")
+    if regressions:
+        print(f"Regressions over {args.threshold}x baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services.http_cache import encoded_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 4))
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings the client accepts (q=0 excluded)"""
+    encodings = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip().removeprefix("q=").strip()
+        if coding and quality not in ("0", "0.0", "0.00", "0.000"):
+            encodings.add(coding.strip().lower())
+    return encodings
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.finish()
+
+class CompressionMiddleware:
+    """Compress responses over a size threshold with brotli, or gzip.
+
+    Brotli is used when the client accepts it and the brotli package is
+    installed. Responses that are already encoded, or smaller than
+    minimum_size, pass through untouched. Compressed responses get their
+    own ETag, tagged with the coding, so caches never confuse a brotli
+    body with a gzip or identity one.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+            if brotli and "br" in encodings:
+                responder = CompressionResponder(self.app, "br", lambda: BrotliCompressor(self.brotli_quality), self.minimum_size)
+                await responder(scope, receive, send)
+                return
+            if "gzip" in encodings:
+                responder = CompressionResponder(self.app, "gzip", lambda: GzipCompressor(self.gzip_level), self.minimum_size)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+class CompressionResponder:
+    """Compresses one response, deciding from its first body chunk"""
+
+    def __init__(self, app: ASGIApp, encoding: str, make_compressor, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.make_compressor = make_compressor
+        self.minimum_size = minimum_size
+        self.initial_message: Message = {}
+        self.started = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        self.if_none_match = Headers(scope=scope).get("if-none-match", "")
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows whether to compress
+            self.initial_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if "content-encoding" not in headers and (more_body or len(body) >= self.minimum_size):
+                self.compressor = self.make_compressor()
+                headers["Content-Encoding"] = self.encoding
+                if more_body:
+                    del headers["Content-Length"]
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+            elif self.initial_message["status"] == 304 and "etag" in headers:
+                # Confirm the coded copy the client revalidated, not the identity one
+                etag = encoded_etag(headers["etag"], self.encoding)
+                if etag in self.if_none_match:
+                    headers["ETag"] = etag
+            await self._send_body(message, body, more_body, headers)
+            return
+        await self._send_body(message, body, more_body)
+
+    async def _send_body(self, message: Message, body: bytes, more_body: bool, headers: MutableHeaders = None):
+        if self.compressor:
+            body = self.compressor.compress(body)
+            if not more_body:
+                body += self.compressor.flush()
+            message["body"] = body
+            if headers is not None and not more_body:
+                headers["Content-Length"] = str(len(body))
+        if headers is not None:
+            await self.send(self.initial_message)
+        await self.send(message)
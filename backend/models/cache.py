@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+class CacheStats(BaseModel):
+    size: int = 0
+    max_size: int = 0
+    ttl: float = 0.0
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0  # misses served by a load already in flight
+    evictions: int = 0
+    expirations: int = 0
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any
+from datetime import datetime
+import uuid
+
+class IngestProgress(BaseModel):
+    files_scanned: int = 0
+    files_parsed: int = 0
+    parts_written: int = 0
+    files_failed: int = 0
+
+class IngestBatchResult(BaseModel):
+    batch: int
+    submitted: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[Dict[str, Any]] = Field(default_factory=list)
+
+class IngestReport(BaseModel):
+    parts_loaded: int = 0
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    files_scanned: int = 0
+    files_failed: int = 0
+    from_snapshot: bool = False
+    batches: List[IngestBatchResult] = Field(default_factory=list)
+
+class IngestJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "pending"  # pending, running, completed, failed or cancelled
+    force_reload: bool = False
+    incremental: bool = False
+    progress: IngestProgress = Field(default_factory=IngestProgress)
+    report: Optional[IngestReport] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,8 +1,29 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from datetime import datetime
 import uuid
 
+class Point(BaseModel):
+    x: float
+    y: float
+
+class Box(BaseModel):
+    x: float
+    y: float
+    width: float
+    height: float
+
+class ConnectorGeometry(BaseModel):
+    svg_id: str
+    center: Point
+    bbox: Box
+    terminal: Optional[Point] = None
+
+class PartView(BaseModel):
+    image: str
+    width: float
+    height: float
+
 class Connector(BaseModel):
     id: str
     name: str
@@ -10,6 +31,11 @@ class Connector(BaseModel):
     description: Optional[str] = ""
     svg_id: Optional[str] = ""
     terminal_id: Optional[str] = ""
+    geometry: Dict[str, ConnectorGeometry] = Field(default_factory=dict)
+
+class Bus(BaseModel):
+    id: str
+    connectors: List[str]  # connector IDs joined inside the part
 
 class FritzingPart(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -20,10 +46,34 @@ class FritzingPart(BaseModel):
     properties: Dict[str, str] = Field(default_factory=dict)
     tags: List[str] = Field(default_factory=list)
     image_path: Optional[str] = ""
+    source: Optional[str] = ""  # parts library folder (core, obsolete, ...); empty for parts made in the editor
+    replaced_by: Optional[str] = ""  # module ID of the part that obsoletes this one
     connectors: List[Connector] = Field(default_factory=list)
+    buses: List[Bus] = Field(default_factory=list)
+    views: Dict[str, PartView] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class PartSummary(BaseModel):
+    id: str
+    module_id: Optional[str] = ""
+    title: str
+    description: Optional[str] = ""
+    tags: List[str] = Field(default_factory=list)
+    image_path: Optional[str] = ""
+    source: Optional[str] = ""
+    properties: Dict[str, str] = Field(default_factory=dict)  # only the family
+    connector_count: int = 0
+
+class PartFacetResults(BaseModel):
+    parts: List[Union[PartSummary, FritzingPart]] = Field(default_factory=list)
+    total: int = 0
+    facets: Dict[str, Dict[str, int]] = Field(default_factory=dict)  # property -> value -> matching parts
+
+class PartBatchResult(BaseModel):
+    parts: Dict[str, FritzingPart] = Field(default_factory=dict)  # keyed by the requested ID or module ID
+    missing: List[str] = Field(default_factory=list)
+
 class PartCreate(BaseModel):
     module_id: Optional[str] = ""
     title: str
@@ -33,6 +83,7 @@ class PartCreate(BaseModel):
     tags: List[str] = Field(default_factory=list)
     image_path: Optional[str] = ""
     connectors: List[Connector] = Field(default_factory=list)
+    buses: List[Bus] = Field(default_factory=list)
 
 class PartUpdate(BaseModel):
     title: Optional[str] = None
@@ -41,4 +92,11 @@ class PartUpdate(BaseModel):
     properties: Optional[Dict[str, str]] = None
     tags: Optional[List[str]] = None
     image_path: Optional[str] = None
-    connectors: Optional[List[Connector]] = None
\ No newline at end of file
+    connectors: Optional[List[Connector]] = None
+    buses: Optional[List[Bus]] = None
+
+class PartReplacement(BaseModel):
+    module_id: str
+    replaced_by: Optional[str] = ""
+    replacement: str
+    chain: List[str] = Field(default_factory=list)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Annotated, Literal, Union
 from datetime import datetime
 import uuid
 
@@ -31,19 +31,98 @@ class Project(BaseModel):
     parts: List[PartInstance] = Field(default_factory=list)
     wires: List[Wire] = Field(default_factory=list)
     canvas_settings: Dict[str, Any] = Field(default_factory=dict)
+    thumbnail: Optional[str] = None  # URL or path of a preview image
+    revision: int = 0  # incremented by every write
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ProjectSummary(BaseModel):
+    id: str
+    name: str
+    description: Optional[str] = ""
+    part_count: int = 0
+    wire_count: int = 0
+    thumbnail: Optional[str] = None
+    revision: int = 0
+    created_at: datetime
+    updated_at: datetime
+
 class ProjectCreate(BaseModel):
     name: str
     description: Optional[str] = ""
     parts: List[PartInstance] = Field(default_factory=list)
     wires: List[Wire] = Field(default_factory=list)
     canvas_settings: Dict[str, Any] = Field(default_factory=dict)
+    thumbnail: Optional[str] = None
 
 class ProjectUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     parts: Optional[List[PartInstance]] = None
     wires: Optional[List[Wire]] = None
-    canvas_settings: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    canvas_settings: Optional[Dict[str, Any]] = None
+    thumbnail: Optional[str] = None
+    expected_revision: Optional[int] = None  # fail with 409 if the project has moved on
+
+class AddPartOp(BaseModel):
+    op: Literal["add_part"]
+    part: PartInstance
+
+class MovePartOp(BaseModel):
+    op: Literal["move_part"]
+    part_id: str  # PartInstance.id
+    position: Position
+    rotation: Optional[float] = None
+
+class RemovePartOp(BaseModel):
+    op: Literal["remove_part"]
+    part_id: str  # also removes the wires attached to it
+
+class AddWireOp(BaseModel):
+    op: Literal["add_wire"]
+    wire: Wire
+
+class RemoveWireOp(BaseModel):
+    op: Literal["remove_wire"]
+    wire_id: str
+
+class SetPropertyOp(BaseModel):
+    op: Literal["set_property"]
+    part_id: str
+    key: str
+    value: Any = None  # None removes the property
+
+ProjectOp = Annotated[
+    Union[AddPartOp, MovePartOp, RemovePartOp, AddWireOp, RemoveWireOp, SetPropertyOp],
+    Field(discriminator="op")
+]
+
+class ProjectOps(BaseModel):
+    ops: List[ProjectOp] = Field(..., min_length=1, max_length=5000)
+    expected_revision: Optional[int] = None
+
+class ProjectOpsResult(BaseModel):
+    id: str
+    applied: int
+    revision: int
+    updated_at: datetime
+
+class NetNode(BaseModel):
+    part_id: str  # PartInstance.id
+    connector: str
+
+class Net(BaseModel):
+    id: str
+    nodes: List[NetNode] = Field(default_factory=list)
+    wires: List[str] = Field(default_factory=list)  # IDs of the wires in this net
+
+class Netlist(BaseModel):
+    project_id: str
+    revision: int
+    nets: List[Net] = Field(default_factory=list)
+
+class ProjectViewport(BaseModel):
+    project_id: str
+    revision: int
+    parts: List[PartInstance] = Field(default_factory=list)  # instances overlapping the viewport
+    wires: List[Wire] = Field(default_factory=list)
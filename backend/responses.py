@@ -0,0 +1,19 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, bypassing response_model validation.
+
+    Meant for documents read from our own collections, which were
+    validated when they were written.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
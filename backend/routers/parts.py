@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Body, Request, Response
+from typing import Any, List, Dict, Optional, Union
 from services.part_service import PartService
-from models.part import FritzingPart, PartCreate, PartUpdate
+from services.ingest_jobs import ingest_jobs
+from services.facet_index import DEFAULT_FACET_KEYS
+from services.pagination import NEXT_CURSOR_HEADER
+from services.http_cache import conditional_get
+from models.part import FritzingPart, PartSummary, PartCreate, PartUpdate, PartReplacement, PartFacetResults, PartBatchResult
+from models.ingest import IngestJob
+from models.cache import CacheStats
 from database import get_database
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/parts", tags=["parts"])
 
@@ -10,23 +17,178 @@ def get_part_service():
     db = get_database()
     return PartService(db.fritzing_parts)
 
-@router.get("/", response_model=List[FritzingPart])
+async def check_catalog_etag(request: Request, response: Response, service: PartService = Depends(get_part_service)):
+    """Tag catalog reads with the catalog revision; answer 304 if the client's copy is current.
+
+    The revision is held in memory, so this usually costs no database read.
+    """
+    conditional_get(request, response, await service.revision.current())
+
+@router.get(
+    "/",
+    response_model=Union[List[FritzingPart], List[PartSummary], List[Dict[str, Any]]],
+    dependencies=[Depends(check_catalog_etag)]
+)
 async def get_parts(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
     family: Optional[str] = Query(None),
+    include_obsolete: bool = Query(False),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated part fields to return"),
+    ranges: List[str] = Query([], alias="range", description="Numeric property ranges such as capacitance>=10nF; repeat to combine"),
     service: PartService = Depends(get_part_service)
 ):
-    """Get all parts with optional filtering"""
-    return await service.get_all_parts(skip=skip, limit=limit, search=search, family=family)
+    """Get all parts with optional filtering.
 
-@router.get("/families", response_model=List[str])
+    view=summary returns just what the part library lists, and fields=
+    returns only the named fields. Parts are encoded straight from the
+    stored documents rather than through the response model. Each
+    range= narrows the results by a numeric property, e.g.
+    range=capacitance>=10nF&range=capacitance<=1uF.
+    """
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    try:
+        parts, next_cursor = await service.get_all_parts(
+            skip=skip,
+            limit=limit,
+            search=search,
+            family=family,
+            include_obsolete=include_obsolete,
+            cursor=cursor,
+            view=view,
+            fields=field_list,
+            ranges=ranges,
+            trusted=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return FastJSONResponse(parts, headers=dict(response.headers))
+
+@router.get("/families", response_model=List[str], dependencies=[Depends(check_catalog_etag)])
 async def get_part_families(service: PartService = Depends(get_part_service)):
     """Get all unique part families"""
     return await service.get_part_families()
 
-@router.get("/{part_id}", response_model=FritzingPart)
+@router.get("/faceted-search", response_model=PartFacetResults, dependencies=[Depends(check_catalog_etag)])
+async def faceted_search(
+    search: Optional[str] = Query(None),
+    filters: List[str] = Query([], alias="filter", description="Property selections as name:value; repeat to combine"),
+    facets: Optional[str] = Query(None, description="Comma-separated properties to count values of"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    include_obsolete: bool = Query(False),
+    view: str = Query("summary", pattern="^(full|summary)$"),
+    service: PartService = Depends(get_part_service)
+):
+    """Search parts by text and property values, with value counts per facet"""
+    selections: Dict[str, List[str]] = {}
+    for selection in filters:
+        name, sep, value = selection.partition(":")
+        if not sep or not name.strip() or not value.strip():
+            raise HTTPException(status_code=400, detail=f"Invalid filter '{selection}', expected name:value")
+        selections.setdefault(name.strip(), []).append(value.strip())
+    facet_keys = [key.strip() for key in facets.split(",") if key.strip()] if facets else DEFAULT_FACET_KEYS
+    results = await service.faceted_search(
+        search=search,
+        selections=selections,
+        facet_keys=facet_keys,
+        skip=skip,
+        limit=limit,
+        include_obsolete=include_obsolete,
+        view=view
+    )
+    if results is None:
+        raise HTTPException(status_code=503, detail="Part search index is still loading")
+    return results
+
+@router.post("/ingest-jobs", response_model=IngestJob, status_code=202)
+async def start_ingest_job(
+    force_reload: bool = Query(False),
+    incremental: bool = Query(False),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000),
+    service: PartService = Depends(get_part_service)
+):
+    """Start a background reload of the fritzing-parts repository"""
+    job = ingest_jobs.start_job(
+        service,
+        force_reload=force_reload,
+        incremental=incremental,
+        batch_size=batch_size
+    )
+    if not job:
+        active = ingest_jobs.active_job()
+        raise HTTPException(status_code=409, detail=f"Ingest job {active.id} is already running")
+    return job
+
+@router.get("/ingest-jobs", response_model=List[IngestJob])
+async def list_ingest_jobs():
+    """List recent ingest jobs"""
+    return ingest_jobs.list_jobs()
+
+@router.get("/ingest-jobs/{job_id}", response_model=IngestJob)
+async def get_ingest_job(job_id: str):
+    """Get the progress of an ingest job"""
+    job = ingest_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
+
+@router.post("/ingest-jobs/{job_id}/cancel", response_model=IngestJob)
+async def cancel_ingest_job(job_id: str):
+    """Cancel a running ingest job"""
+    if not ingest_jobs.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    job = ingest_jobs.cancel_job(job_id)
+    if not job:
+        raise HTTPException(status_code=409, detail="Ingest job is not running")
+    return job
+
+@router.get("/archive-svg", dependencies=[Depends(check_catalog_etag)])
+async def get_archive_svg(
+    response: Response,
+    archive: str = Query(..., description="Path of the .fzpz part relative to the parts root"),
+    image: str = Query(..., description="Layer image as referenced by the part, e.g. breadboard/foo.svg"),
+    service: PartService = Depends(get_part_service)
+):
+    """Serve an SVG bundled inside an .fzpz part, which has no file of its own to link to"""
+    data = await service.get_archive_image(archive, image)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return Response(content=data, media_type="image/svg+xml", headers=dict(response.headers))
+
+@router.get("/replacements/{module_id}", response_model=PartReplacement, dependencies=[Depends(check_catalog_etag)])
+async def get_part_replacement(module_id: str, service: PartService = Depends(get_part_service)):
+    """Resolve a module ID to the part that currently replaces it"""
+    return await service.resolve_replacement(module_id)
+
+@router.post("/replacements/resolve", response_model=Dict[str, str])
+async def resolve_part_replacements(
+    module_ids: List[str] = Body(..., max_length=5000),
+    service: PartService = Depends(get_part_service)
+):
+    """Resolve many module IDs to their current replacements"""
+    return await service.resolve_replacements(module_ids)
+
+@router.post("/batch", response_model=PartBatchResult)
+async def get_parts_batch(
+    ids: List[str] = Body(..., max_length=5000),
+    service: PartService = Depends(get_part_service)
+):
+    """Get many parts by ID or module ID; IDs with no part are listed as missing"""
+    return await service.get_parts_batch(ids)
+
+@router.get("/cache-stats", response_model=CacheStats)
+async def get_part_cache_stats(service: PartService = Depends(get_part_service)):
+    """Get hit, miss and eviction counters of this process's part cache"""
+    return service.cache.stats()
+
+@router.get("/{part_id}", response_model=FritzingPart, dependencies=[Depends(check_catalog_etag)])
 async def get_part(part_id: str, service: PartService = Depends(get_part_service)):
     """Get a specific part by ID"""
     part = await service.get_part_by_id(part_id)
@@ -58,15 +220,3 @@ async def delete_part(part_id: str, service: PartService = Depends(get_part_serv
     if not success:
         raise HTTPException(status_code=404, detail="Part not found")
     return {"message": "Part deleted successfully"}
-
-@router.post("/load-fritzing-parts")
-async def load_fritzing_parts(
-    force_reload: bool = Query(False),
-    service: PartService = Depends(get_part_service)
-):
-    """Load parts from the fritzing-parts repository"""
-    parts_loaded = await service.load_fritzing_parts(force_reload=force_reload)
-    return {
-        "message": f"Successfully loaded {parts_loaded} parts",
-        "parts_loaded": parts_loaded
-    }
\ No newline at end of file
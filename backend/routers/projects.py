@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Header, Response
 from typing import List, Optional
-from services.project_service import ProjectService
-from models.project import Project, ProjectCreate, ProjectUpdate
+from services.project_service import ProjectService, RevisionConflict
+from services.netlist_service import NetlistService
+from services.viewport_service import ViewportService
+from services.spatial_index import parse_bbox
+from services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from services.http_cache import if_match_revision, project_etag
+from models.project import Project, ProjectCreate, ProjectUpdate, ProjectOps, ProjectOpsResult, Netlist, ProjectViewport
 from database import get_database
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -10,23 +16,86 @@ def get_project_service():
     db = get_database()
     return ProjectService(db.projects)
 
+def get_netlist_service():
+    db = get_database()
+    return NetlistService(db.projects, db.fritzing_parts)
+
+def get_viewport_service():
+    db = get_database()
+    return ViewportService(db.projects, db.fritzing_parts)
+
 @router.get("/", response_model=List[Project])
 async def get_projects(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$"),
     service: ProjectService = Depends(get_project_service)
 ):
-    """Get all projects"""
-    return await service.get_all_projects(skip=skip, limit=limit)
+    """Get all projects, most recently updated first.
+
+    view=summary returns just what the project list shows: name,
+    description, part and wire counts, thumbnail and dates.
+    """
+    try:
+        projects, next_cursor = await service.get_all_projects(
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            view=view,
+            trusted=True
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return FastJSONResponse(projects, headers=dict(response.headers))
+
+def expected_revision(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """Revision named by an If-Match header, if any"""
+    try:
+        return if_match_revision(if_match)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def revision_conflict(e: RevisionConflict) -> HTTPException:
+    """409 carrying the current revision's ETag; nothing from the request was written"""
+    return HTTPException(status_code=409, detail=str(e), headers={"ETag": project_etag(e.revision)})
 
 @router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: str, service: ProjectService = Depends(get_project_service)):
+async def get_project(response: Response, project_id: str, service: ProjectService = Depends(get_project_service)):
     """Get a specific project by ID"""
     project = await service.get_project_by_id(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    response.headers["ETag"] = project_etag(project.revision)
     return project
 
+@router.get("/{project_id}/netlist", response_model=Netlist)
+async def get_project_netlist(project_id: str, service: NetlistService = Depends(get_netlist_service)):
+    """Get the electrical nets formed by a project's wires and its parts' internal buses"""
+    netlist = await service.get_netlist(project_id)
+    if not netlist:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return netlist
+
+@router.get("/{project_id}/viewport", response_model=ProjectViewport)
+async def get_project_viewport(
+    project_id: str,
+    bbox: str = Query(..., description="min_x,min_y,max_x,max_y in canvas units"),
+    service: ViewportService = Depends(get_viewport_service)
+):
+    """Get the part instances and wires of a project that overlap a region of the canvas"""
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    viewport = await service.get_viewport(project_id, box)
+    if not viewport:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return FastJSONResponse(viewport)
+
 @router.post("/", response_model=Project)
 async def create_project(project_data: ProjectCreate, service: ProjectService = Depends(get_project_service)):
     """Create a new project"""
@@ -34,16 +103,43 @@ async def create_project(project_data: ProjectCreate, service: ProjectService =
 
 @router.put("/{project_id}", response_model=Project)
 async def update_project(
+    response: Response,
     project_id: str, 
     project_data: ProjectUpdate, 
+    if_match: Optional[int] = Depends(expected_revision),
     service: ProjectService = Depends(get_project_service)
 ):
-    """Update an existing project"""
-    project = await service.update_project(project_id, project_data)
+    """Update an existing project, optionally only if it is still at a given revision"""
+    try:
+        project = await service.update_project(project_id, project_data, expected_revision=if_match)
+    except RevisionConflict as e:
+        raise revision_conflict(e)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    response.headers["ETag"] = project_etag(project.revision)
     return project
 
+@router.patch("/{project_id}/ops", response_model=ProjectOpsResult)
+async def apply_project_ops(
+    response: Response,
+    project_id: str,
+    body: ProjectOps,
+    if_match: Optional[int] = Depends(expected_revision),
+    service: ProjectService = Depends(get_project_service)
+):
+    """Apply a batch of granular edits (add, move or remove parts and wires, set properties)"""
+    revision = if_match if if_match is not None else body.expected_revision
+    try:
+        result = await service.apply_ops(project_id, body.ops, expected_revision=revision)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RevisionConflict as e:
+        raise revision_conflict(e)
+    if not result:
+        raise HTTPException(status_code=404, detail="Project not found")
+    response.headers["ETag"] = project_etag(result.revision)
+    return result
+
 @router.delete("/{project_id}")
 async def delete_project(project_id: str, service: ProjectService = Depends(get_project_service)):
     """Delete a project"""
@@ -11,7 +11,13 @@ from contextlib import asynccontextmanager
 # Import routers
 from routers.parts import router as parts_router
 from routers.projects import router as projects_router
-from database import connect_to_mongo, close_mongo_connection
+from database import connect_to_mongo, close_mongo_connection, get_database
+from services.part_service import PartService
+from services.project_service import ProjectService
+from services.pagination import NEXT_CURSOR_HEADER
+from compression import CompressionMiddleware
+from services.ingest_jobs import ingest_jobs
+from services.parts_watcher import PartsWatcher
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -22,8 +28,24 @@ load_dotenv(ROOT_DIR / '.env')
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    part_service = PartService(get_database().fritzing_parts)
+    await part_service.ensure_indexes()
+    await part_service.backfill_numeric_properties()
+    await part_service.refresh_search_index()
+    await part_service.revision.refresh()
+    project_service = ProjectService(get_database().projects)
+    await project_service.ensure_indexes()
+    await project_service.backfill_revisions()
+    await project_service.backfill_counts()
+    watcher = None
+    if os.environ.get('WATCH_FRITZING_PARTS', '').lower() in ('1', 'true', 'yes'):
+        watcher = PartsWatcher(part_service)
+        await watcher.start()
     yield
     # Shutdown
+    if watcher:
+        await watcher.stop()
+    await ingest_jobs.shutdown()
     await close_mongo_connection()
 
 # Create the main app
@@ -53,6 +75,9 @@ api_router.include_router(projects_router)
 # Include the router in the main app
 app.include_router(api_router)
 
+# Compress large responses
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -60,6 +85,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Configure logging
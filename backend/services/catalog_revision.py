@@ -0,0 +1,75 @@
+import os
+import time
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+CATALOG_REVISION_ID = "catalog"
+
+# How long a revision read from Mongo is trusted before reading it again;
+# bounds how late this process notices a change made by another one
+CATALOG_REVISION_TTL = float(os.environ.get('CATALOG_REVISION_TTL', 5))
+
+class _LatestRevision:
+    """The newest revision this process has read or written"""
+
+    def __init__(self):
+        self.value: Optional[int] = None
+        self.expires_at = 0.0
+
+    def get(self) -> Optional[int]:
+        if self.value is not None and time.monotonic() < self.expires_at:
+            return self.value
+        return None
+
+    def set(self, value: int, ttl: float):
+        # Concurrent bumps can finish out of order; never go back while fresh
+        current = self.get()
+        self.value = value if current is None else max(current, value)
+        self.expires_at = time.monotonic() + ttl
+
+# Shared by every CatalogRevision in this process, so catalog reads
+# don't need a database round trip for their ETag
+latest_revision = _LatestRevision()
+
+class CatalogRevision:
+    """Counter bumped whenever catalog contents change.
+
+    Kept in Mongo rather than in the process so every server process
+    derives the same ETags; each process holds the latest value in
+    memory and reads Mongo again only once it is older than the TTL.
+    """
+
+    def __init__(
+        self,
+        db_collection: AsyncIOMotorCollection,
+        latest: _LatestRevision = latest_revision,
+        ttl: float = CATALOG_REVISION_TTL
+    ):
+        self.collection = db_collection
+        self.latest = latest
+        self.ttl = ttl
+
+    async def current(self) -> int:
+        """Get the current catalog revision"""
+        value = self.latest.get()
+        if value is not None:
+            return value
+        return await self.refresh()
+
+    async def refresh(self) -> int:
+        """Read the revision from Mongo into memory"""
+        document = await self.collection.find_one({"_id": CATALOG_REVISION_ID})
+        value = document["value"] if document else 0
+        self.latest.set(value, self.ttl)
+        return value
+
+    async def bump(self) -> int:
+        """Advance the revision after a change to the catalog"""
+        document = await self.collection.find_one_and_update(
+            {"_id": CATALOG_REVISION_ID},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=True
+        )
+        self.latest.set(document["value"], self.ttl)
+        return document["value"]
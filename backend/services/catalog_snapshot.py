@@ -0,0 +1,105 @@
+import argparse
+import hashlib
+import marshal
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from services.fzp_parser import PARSER_VERSION, file_fingerprint, ingest_fzp_file, resolve_svg_path, source_of
+
+SNAPSHOT_MAGIC = b"FZCATSNP"
+# The snapshot holds parser output, so a new parser invalidates it
+SNAPSHOT_VERSION = PARSER_VERSION
+SNAPSHOT_PATH = Path(os.environ.get('CATALOG_SNAPSHOT_PATH', Path(__file__).parent.parent / "catalog_snapshot.bin"))
+
+# magic, format version, SHA-1 of the source tree
+HEADER = struct.Struct(">8sH40s")
+
+# The snapshot is a fixed header followed by a zlib-compressed marshal dump
+# of the ingested items (part plus manifest entry, exactly as produced by
+# ingest_fzp_file). marshal only handles plain containers and scalars, so
+# loading a snapshot can't run code the way unpickling could.
+
+def source_tree_hash(parts_root: Path, fzp_paths: List[str], items: List[Dict[str, Any]]) -> str:
+    """Hash the FZP files on disk and the SVGs the catalog parts reference"""
+    paths = set(fzp_paths)
+    for item in items:
+        source = source_of(item["manifest"]["path"])
+        for svg in item["manifest"]["svgs"]:
+            # Resolve again so an SVG that has appeared since changes the hash
+            svg_path = resolve_svg_path(parts_root, svg["image"], source)
+            paths.add(svg_path.relative_to(parts_root).as_posix() if svg_path else f"missing:{svg['image']}")
+    
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(path.encode("utf-8") + b"\0")
+        if not path.startswith("missing:"):
+            digest.update(file_fingerprint(parts_root / path)["sha1"].encode("ascii"))
+    return digest.hexdigest()
+
+def write_snapshot(output: Path, tree_hash: str, items: List[Dict[str, Any]]):
+    """Write a snapshot file atomically"""
+    payload = zlib.compress(marshal.dumps({
+        "created_at": datetime.utcnow().isoformat(),
+        "items": items
+    }))
+    tmp_path = output.with_name(output.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, tree_hash.encode("ascii")))
+        f.write(payload)
+    os.replace(tmp_path, output)
+
+def read_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a snapshot file, or None if it is missing or from another format version"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+            magic, version, tree_hash = HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return None
+            snapshot = marshal.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, zlib.error) as e:
+        print(f"Error reading catalog snapshot {path}: {str(e)}")
+        return None
+    snapshot["tree_hash"] = tree_hash.decode("ascii")
+    return snapshot
+
+def load_snapshot(path: Path, parts_root: Path, fzp_files: List[Path]) -> Optional[List[Dict[str, Any]]]:
+    """Load the snapshot's items if it still matches the source tree"""
+    snapshot = read_snapshot(path)
+    if snapshot is None:
+        return None
+    fzp_paths = [fzp_file.relative_to(parts_root).as_posix() for fzp_file in fzp_files]
+    if source_tree_hash(parts_root, fzp_paths, snapshot["items"]) != snapshot["tree_hash"]:
+        print(f"Catalog snapshot {path} is out of date, parsing parts instead")
+        return None
+    return snapshot["items"]
+
+def build_snapshot(parts_root: Path, fzp_files: List[Path], output: Path, max_workers: Optional[int] = None) -> int:
+    """Parse every FZP file and compile the results into a snapshot"""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        parsed = pool.map(partial(ingest_fzp_file, parts_root=str(parts_root)), map(str, fzp_files), chunksize=32)
+        items = [item for item in parsed if item is not None]
+    fzp_paths = [fzp_file.relative_to(parts_root).as_posix() for fzp_file in fzp_files]
+    write_snapshot(output, source_tree_hash(parts_root, fzp_paths, items), items)
+    return len(items)
+
+if __name__ == "__main__":
+    from services.part_service import PartService
+    
+    parser = argparse.ArgumentParser(description="Compile the parts library into a catalog snapshot")
+    parser.add_argument("--parts-root", type=Path, default=Path("/app/public/parts"))
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+    
+    fzp_files = PartService.scan_fzp_files(args.parts_root)
+    count = build_snapshot(args.parts_root, fzp_files, args.output)
+    print(f"Wrote {count} parts to {args.output}")
@@ -0,0 +1,98 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+# Facets the part library offers by default
+DEFAULT_FACET_KEYS = ("family", "package", "type", "voltage")
+
+def facet_values(properties: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Facet values of a part: property names lowercased, blank values dropped"""
+    values = {}
+    for name, value in (properties or {}).items():
+        value = (value or "").strip()
+        if value:
+            values[name.strip().lower()] = value
+    return values
+
+class PartFacetIndex:
+    """Per-property value counts over the parts catalog.
+
+    Counts for the whole catalog are kept up to date as parts are added
+    and removed, so unfiltered facets are a lookup. Filtered facets are
+    counted over the matching parts only.
+    """
+
+    def __init__(self):
+        self.part_values: Dict[str, Dict[str, str]] = {}
+        self.obsolete: Set[str] = set()
+        # Counts over every part, and over parts that aren't obsolete
+        self.counts: Dict[str, Counter] = {}
+        self.current_counts: Dict[str, Counter] = {}
+
+    def _count(self, values: Dict[str, str], obsolete: bool, delta: int):
+        for key, value in values.items():
+            targets = [self.counts] if obsolete else [self.counts, self.current_counts]
+            for counts in targets:
+                counter = counts.setdefault(key, Counter())
+                counter[value] += delta
+                if counter[value] <= 0:
+                    del counter[value]
+                    if not counter:
+                        del counts[key]
+
+    def add(self, part_id: str, properties: Optional[Dict[str, str]], obsolete: bool = False):
+        """Count a part's property values, replacing any earlier version of it"""
+        self.remove(part_id)
+        values = facet_values(properties)
+        self.part_values[part_id] = values
+        if obsolete:
+            self.obsolete.add(part_id)
+        self._count(values, obsolete, 1)
+
+    def remove(self, part_id: str):
+        """Stop counting a part"""
+        values = self.part_values.pop(part_id, None)
+        if values is None:
+            return
+        obsolete = part_id in self.obsolete
+        self.obsolete.discard(part_id)
+        self._count(values, obsolete, -1)
+
+    def value(self, part_id: str, key: str) -> Optional[str]:
+        """A part's value for one facet key"""
+        return self.part_values.get(part_id, {}).get(key)
+
+    def matches(self, part_id: str, selections: Dict[str, List[str]]) -> bool:
+        """True if the part has one of the selected values for every selected key"""
+        values = self.part_values.get(part_id, {})
+        return all(values.get(key) in wanted for key, wanted in selections.items())
+
+    def facet_counts(
+        self,
+        keys: Iterable[str],
+        part_ids: Optional[Iterable[str]] = None,
+        selections: Optional[Dict[str, List[str]]] = None,
+        include_obsolete: bool = False
+    ) -> Dict[str, Dict[str, int]]:
+        """Value counts per key over the given parts (default: the whole catalog).
+
+        Selections on other keys narrow a key's counts, but its own
+        selection doesn't, so the UI can offer alternatives to it.
+        """
+        selections = selections or {}
+        result = {}
+        for key in keys:
+            other_selections = {k: v for k, v in selections.items() if k != key}
+            if part_ids is None and not other_selections:
+                counts = self.counts if include_obsolete else self.current_counts
+                counter = counts.get(key, Counter())
+            else:
+                candidates = self.part_values if part_ids is None else part_ids
+                counter = Counter()
+                for part_id in candidates:
+                    if not include_obsolete and part_id in self.obsolete:
+                        continue
+                    value = self.value(part_id, key)
+                    if value is not None and self.matches(part_id, other_selections):
+                        counter[value] += 1
+            result[key] = dict(sorted(counter.items(), key=lambda item: (-item[1], item[0])))
+        return result
@@ -0,0 +1,329 @@
+import hashlib
+import io
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from urllib.parse import urlencode
+from typing import Optional, Dict, Any, Tuple
+from models.part import Bus, Connector
+from services.svg_geometry import SvgDocument, load_svg_document, parse_svg_document
+
+# Views whose layer images are part of a part's inputs
+SVG_VIEWS = ('iconView', 'breadboardView', 'schematicView', 'pcbView')
+
+# Folders parts are loaded from; SVGs live under svg/<source>, and a layer
+# image is looked up in the part's own source folder first
+PART_SOURCES = ('core', 'obsolete', 'contrib', 'user')
+
+PART_FILE_SUFFIXES = ('.fzp', '.fzpz')
+
+MISSING_FILE = {"mtime": 0, "size": -1, "sha1": ""}
+
+# Bumped whenever parsing the same files yields different parts, so that
+# parts built by an older parser are not mistaken for unchanged ones
+PARSER_VERSION = 7
+
+# Views whose connector positions are resolved from the SVG at ingest time
+GEOMETRY_VIEWS = {'breadboardView': 'breadboard', 'schematicView': 'schematic', 'pcbView': 'pcb'}
+
+# Parsing lives at module level (rather than on PartService) so that it can be
+# shipped to worker processes by the ingestion pipeline.
+
+def parse_fzp_file(fzp_path: str) -> Optional[Dict[str, Any]]:
+    """Parse a .fzp file and extract component information"""
+    try:
+        if not os.path.exists(fzp_path):
+            return None
+            
+        tree = ET.parse(fzp_path)
+        return parse_module(tree.getroot())
+        
+    except Exception as e:
+        print(f"Error parsing FZP file {fzp_path}: {str(e)}")
+        return None
+
+def parse_module(root: ET.Element) -> Optional[Dict[str, Any]]:
+    """Extract component information from a parsed <module> element"""
+    if root.tag != 'module':
+        return None
+    
+    # Extract basic information
+    title = root.find('title')
+    title_text = title.text if title is not None else ''
+    
+    description = root.find('description')
+    description_text = description.text if description is not None else ''
+    
+    author = root.find('author')
+    author_text = author.text if author is not None else ''
+    
+    # Obsolete parts name their successor on the version element
+    version = root.find('version')
+    replaced_by = version.get('replacedby', '') if version is not None else ''
+    
+    # Extract properties
+    properties = {}
+    properties_elem = root.find('properties')
+    if properties_elem is not None:
+        for prop in properties_elem.findall('property'):
+            name = prop.get('name')
+            value = prop.text
+            if name and value:
+                properties[name] = value
+    
+    # Extract tags
+    tags = []
+    tags_elem = root.find('tags')
+    if tags_elem is not None:
+        for tag in tags_elem.findall('tag'):
+            if tag.text:
+                tags.append(tag.text)
+    
+    # Extract image path for breadboard view
+    image_path = ""
+    breadboard_view = root.find('.//breadboardView')
+    if breadboard_view is not None:
+        layers = breadboard_view.find('layers')
+        if layers is not None:
+            image_attr = layers.get('image')
+            if image_attr:
+                image_path = f"/parts/svg/core/{image_attr}"
+    
+    # Extract connectors
+    connectors = []
+    for connector_elem in root.findall('.//connector'):
+        connector_id = connector_elem.get('id', '')
+        connector_name = connector_elem.get('name', '')
+        connector_type = connector_elem.get('type', '')
+        
+        desc_elem = connector_elem.find('description')
+        connector_desc = desc_elem.text if desc_elem is not None else ''
+        
+        # Get breadboard view info
+        breadboard_p = connector_elem.find('.//breadboardView/p')
+        svg_id = breadboard_p.get('svgId', '') if breadboard_p is not None else ''
+        terminal_id = breadboard_p.get('terminalId', '') if breadboard_p is not None else ''
+        
+        connectors.append(Connector(
+            id=connector_id,
+            name=connector_name,
+            type=connector_type,
+            description=connector_desc,
+            svg_id=svg_id,
+            terminal_id=terminal_id
+        ))
+    
+    # Extract internal buses: connectors wired together inside the part
+    buses = []
+    buses_elem = root.find('buses')
+    if buses_elem is not None:
+        for bus_elem in buses_elem.findall('bus'):
+            members = [
+                member.get('connectorId') for member in bus_elem.findall('nodeMember')
+                if member.get('connectorId')
+            ]
+            if len(members) > 1:
+                buses.append(Bus(id=bus_elem.get('id', ''), connectors=members))
+    
+    return {
+        "module_id": root.get('moduleId', ''),
+        "title": title_text,
+        "description": description_text,
+        "author": author_text,
+        "replaced_by": replaced_by,
+        "properties": properties,
+        "tags": tags,
+        "image_path": image_path,
+        "connectors": [connector.dict() for connector in connectors],
+        "buses": [bus.dict() for bus in buses]
+    }
+
+def source_of(path: str) -> str:
+    """The source folder (core, obsolete, ...) of a path relative to the parts root"""
+    return Path(path).parts[0]
+
+def layer_images(root: ET.Element) -> Dict[str, str]:
+    """Map each view to the layer image it references"""
+    images = {}
+    for view in SVG_VIEWS:
+        layers = root.find(f'views/{view}/layers')
+        if layers is not None and layers.get('image'):
+            images[view] = layers.get('image')
+    return images
+
+def resolve_svg_path(parts_root: Path, image: str, source: str = 'core') -> Optional[Path]:
+    """Find the SVG file for a layer image the way Fritzing does"""
+    for folder in (source,) + tuple(s for s in PART_SOURCES if s != source):
+        svg_path = parts_root / 'svg' / folder / image
+        if svg_path.is_file():
+            return svg_path
+    return None
+
+def archive_svg(archive: zipfile.ZipFile, image: str) -> Optional[bytes]:
+    """Read a layer image from an .fzpz archive, where it is stored as svg.<view>.<file>"""
+    names = archive.namelist()
+    wanted = "svg." + image.replace("/", ".")
+    if wanted in names:
+        return archive.read(wanted)
+    basename = image.rsplit("/", 1)[-1]
+    for name in names:
+        if name.startswith("svg.") and name.endswith("." + basename):
+            return archive.read(name)
+    return None
+
+def archive_image_path(archive: str, image: str) -> str:
+    """URL of a layer image bundled in an .fzpz archive (a path relative to the parts root)"""
+    return "/api/parts/archive-svg?" + urlencode({"archive": archive, "image": image})
+
+def read_archive_image(parts_root: Path, archive: str, image: str) -> Optional[bytes]:
+    """Read a bundled layer image, refusing archives outside the parts root"""
+    root = parts_root.resolve()
+    archive_path = (root / archive).resolve()
+    if archive_path.suffix != '.fzpz' or root not in archive_path.parents or not archive_path.is_file():
+        return None
+    try:
+        with zipfile.ZipFile(archive_path) as bundle:
+            return archive_svg(bundle, image)
+    except (zipfile.BadZipFile, OSError) as e:
+        print(f"Error reading {image} from {archive_path}: {str(e)}")
+        return None
+
+def add_connector_geometry(part: Dict[str, Any], root: ET.Element, documents: Dict[str, Tuple[str, Optional[SvgDocument]]]):
+    """Resolve each connector's per-view position from the part's SVGs"""
+    part["views"] = {}
+    documents = {view_tag: entry for view_tag, entry in documents.items() if entry[1] is not None}
+    for view_tag, (image, document) in documents.items():
+        part["views"][GEOMETRY_VIEWS[view_tag]] = {"image": image, "width": document.width, "height": document.height}
+    
+    # Connectors were extracted in document order, so they line up with findall
+    for connector, connector_elem in zip(part["connectors"], root.findall('.//connector')):
+        geometry = {}
+        for view_tag, (image, document) in documents.items():
+            p = connector_elem.find(f'.//{view_tag}/p')
+            if p is None:
+                continue
+            box = document.element_box(p.get('svgId'))
+            if box is None:
+                continue
+            min_x, min_y, max_x, max_y = box
+            terminal_box = document.element_box(p.get('terminalId'))
+            geometry[GEOMETRY_VIEWS[view_tag]] = {
+                "svg_id": p.get('svgId'),
+                "center": {"x": (min_x + max_x) / 2, "y": (min_y + max_y) / 2},
+                "bbox": {"x": min_x, "y": min_y, "width": max_x - min_x, "height": max_y - min_y},
+                "terminal": {
+                    "x": (terminal_box[0] + terminal_box[2]) / 2,
+                    "y": (terminal_box[1] + terminal_box[3]) / 2
+                } if terminal_box else None
+            }
+        connector["geometry"] = geometry
+
+def file_fingerprint(path: Path) -> Dict[str, Any]:
+    """Stat and hash a file for the ingest manifest"""
+    try:
+        stat = path.stat()
+        data = path.read_bytes()
+    except OSError:
+        return dict(MISSING_FILE)
+    return {"mtime": stat.st_mtime, "size": stat.st_size, "sha1": hashlib.sha1(data).hexdigest()}
+
+def ingest_fzp_file(fzp_path: str, parts_root: str) -> Optional[Dict[str, Any]]:
+    """Parse a .fzp or .fzpz file and fingerprint it together with the SVGs it references"""
+    fzp = Path(fzp_path)
+    root_dir = Path(parts_root)
+    path = fzp.relative_to(root_dir).as_posix()
+    source = source_of(path)
+    archive = None
+    try:
+        raw = fzp.read_bytes()
+        stat = fzp.stat()
+        if fzp.suffix == '.fzpz':
+            # Members are read straight out of the archive; nothing is extracted to disk
+            archive = zipfile.ZipFile(io.BytesIO(raw))
+            data = archive.read(next(name for name in archive.namelist() if name.endswith('.fzp')))
+        else:
+            data = raw
+        root = ET.fromstring(data)
+        part = parse_module(root)
+    except Exception as e:
+        print(f"Error parsing FZP file {fzp_path}: {str(e)}")
+        return None
+    
+    if part is None:
+        return None
+    part["source"] = source
+    
+    svgs = []
+    documents = {}
+    for view_tag, image in layer_images(root).items():
+        svg_data = archive_svg(archive, image) if archive is not None else None
+        if svg_data is not None:
+            # Bundled SVGs are covered by the archive's own hash, and served out of it
+            if view_tag == 'breadboardView':
+                part["image_path"] = archive_image_path(path, image)
+            if view_tag in GEOMETRY_VIEWS:
+                documents[view_tag] = (image, parse_svg_document(svg_data))
+            continue
+        
+        svg_path = resolve_svg_path(root_dir, image, source)
+        if svg_path is None:
+            svgs.append({"image": image, "path": "", **MISSING_FILE})
+            continue
+        svg_rel = svg_path.relative_to(root_dir).as_posix()
+        svgs.append({"image": image, "path": svg_rel, **file_fingerprint(svg_path)})
+        if view_tag == 'breadboardView':
+            part["image_path"] = f"/parts/{svg_rel}"
+        if view_tag in GEOMETRY_VIEWS:
+            documents[view_tag] = (image, load_svg_document(svg_path))
+    
+    try:
+        add_connector_geometry(part, root, documents)
+    except Exception as e:
+        print(f"Error resolving connector geometry for {fzp_path}: {str(e)}")
+    
+    return {
+        "part": part,
+        "manifest": {
+            "path": path,
+            "module_id": part["module_id"],
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha1": hashlib.sha1(raw).hexdigest(),
+            "svgs": svgs,
+            "parser_version": PARSER_VERSION
+        }
+    }
+
+def manifest_entry_unchanged(entry: Dict[str, Any], parts_root: Path) -> bool:
+    """Cheaply check, by mtime and size only, that a manifest entry is still current"""
+    if entry.get("parser_version") != PARSER_VERSION:
+        return False
+    try:
+        stat = (parts_root / entry["path"]).stat()
+    except OSError:
+        return False
+    if stat.st_mtime != entry["mtime"] or stat.st_size != entry["size"]:
+        return False
+    
+    source = source_of(entry["path"])
+    for svg in entry.get("svgs", []):
+        svg_path = resolve_svg_path(parts_root, svg["image"], source)
+        if svg_path is None:
+            if svg["path"]:
+                return False
+            continue
+        if svg_path.relative_to(parts_root).as_posix() != svg["path"]:
+            return False
+        stat = svg_path.stat()
+        if stat.st_mtime != svg["mtime"] or stat.st_size != svg["size"]:
+            return False
+    return True
+
+def manifest_content_equal(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    """Compare two manifest entries by content hash and the parser that read them"""
+    return (
+        old.get("parser_version") == new.get("parser_version")
+        and old["sha1"] == new["sha1"]
+        and [(s["path"], s["sha1"]) for s in old.get("svgs", [])] == [(s["path"], s["sha1"]) for s in new.get("svgs", [])]
+    )
@@ -0,0 +1,57 @@
+import hashlib
+from typing import Optional
+from fastapi import HTTPException, Request, Response
+
+# Responses may be stored, but must be revalidated with their ETag before reuse
+CATALOG_CACHE_CONTROL = "public, no-cache"
+
+# Content codings the compression middleware tags onto the ETags of encoded bodies
+ETAG_CODINGS = ("br", "gzip")
+
+def revision_etag(revision: int, request: Request) -> str:
+    """Strong ETag for one representation of a resource at a given revision"""
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    variant = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+    return f'"{revision}-{variant}"'
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of a representation sent with a content coding, e.g. "3-abc" as "3-abc-br" for brotli"""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def decoded_etag(etag: str) -> str:
+    """The ETag a representation had before encoded_etag tagged it with a content coding"""
+    for encoding in ETAG_CODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag, in any content coding"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(decoded_etag(tag.removeprefix("W/")) == etag for tag in tags)
+
+def conditional_get(request: Request, response: Response, revision: int, cache_control: str = CATALOG_CACHE_CONTROL):
+    """Add ETag and Cache-Control headers, or stop with 304 if the client's copy is current"""
+    etag = revision_etag(revision, request)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+def project_etag(revision: int) -> str:
+    """ETag of a project at a given revision, for If-Match on writes"""
+    return f'"{revision}"'
+
+def if_match_revision(if_match: Optional[str]) -> Optional[int]:
+    """Revision a write is conditional on, from an If-Match header ("*" or absent: any)"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    tag = decoded_etag(if_match.strip())
+    if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+        return int(tag[1:-1])
+    raise ValueError("If-Match must be a project ETag such as \"3\"")
@@ -0,0 +1,94 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from models.ingest import IngestJob
+from services.part_service import PartService
+
+class IngestJobManager:
+    """Runs catalog reloads as background tasks, one at a time"""
+
+    def __init__(self, max_history: int = 20):
+        self.max_history = max_history
+        self.jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def active_job(self) -> Optional[IngestJob]:
+        """Get the job that is currently pending or running"""
+        for job_id in self.tasks:
+            return self.jobs[job_id]
+        return None
+
+    def get_job(self, job_id: str) -> Optional[IngestJob]:
+        """Get a job by ID"""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestJob]:
+        """List recent jobs, newest first"""
+        return list(reversed(self.jobs.values()))
+
+    def start_job(
+        self,
+        service: PartService,
+        force_reload: bool = False,
+        incremental: bool = False,
+        batch_size: Optional[int] = None
+    ) -> Optional[IngestJob]:
+        """Start a reload in the background, unless one is already running"""
+        if self.active_job():
+            return None
+        
+        job = IngestJob(force_reload=force_reload, incremental=incremental)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_history:
+            self.jobs.popitem(last=False)
+        
+        task = asyncio.create_task(self._run(job, service, batch_size))
+        self.tasks[job.id] = task
+        task.add_done_callback(lambda _: self._finish(job))
+        return job
+
+    def cancel_job(self, job_id: str) -> Optional[IngestJob]:
+        """Request cancellation of a pending or running job"""
+        task = self.tasks.get(job_id)
+        if not task:
+            return None
+        task.cancel()
+        return self.jobs[job_id]
+
+    def _finish(self, job: IngestJob):
+        self.tasks.pop(job.id, None)
+        # A job cancelled before it got to run never reaches _run's handlers
+        if job.status == "pending":
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+
+    async def _run(self, job: IngestJob, service: PartService, batch_size: Optional[int]):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            job.report = await service.load_fritzing_parts(
+                force_reload=job.force_reload,
+                batch_size=batch_size,
+                incremental=job.incremental,
+                progress=job.progress
+            )
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            print(f"Ingest job {job.id} failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    async def shutdown(self):
+        """Cancel any running job and wait for it to stop"""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# Shared by every request so that only one reload runs per process
+ingest_jobs = IngestJobManager()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from models.ingest import IngestBatchResult, IngestProgress
+from services.fzp_parser import ingest_fzp_file
+
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', os.cpu_count() or 1))
+INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', 256))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 500))
+
+BatchWriter = Callable[[int, List[Dict[str, Any]]], Awaitable[IngestBatchResult]]
+
+class IngestionPipeline:
+    """Parse FZP files in a process pool and feed the results to a writer coroutine.
+
+    Parser tasks hand each file to the pool and push the parsed part, along
+    with its manifest entry, onto a bounded queue; a single writer drains the queue and flushes it in
+    batches. When the writer falls behind, the queue fills up and parsing
+    pauses, so memory stays bounded and the event loop is never blocked by
+    XML parsing.
+    """
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        parts_root: Path,
+        max_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[IngestProgress] = None
+    ):
+        self.writer = writer
+        self.parts_root = parts_root
+        self.max_workers = max(1, max_workers or INGEST_WORKERS)
+        self.queue_size = max(1, queue_size or INGEST_QUEUE_SIZE)
+        self.batch_size = max(1, batch_size or INGEST_BATCH_SIZE)
+        self.progress = progress or IngestProgress()
+        self.batches: List[IngestBatchResult] = []
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        """Hand a batch of parsed parts to the writer and record its result"""
+        try:
+            result = await self.writer(len(self.batches), batch)
+        except Exception as e:
+            print(f"Error writing batch {len(self.batches)}: {str(e)}")
+            result = IngestBatchResult(
+                batch=len(self.batches),
+                submitted=len(batch),
+                errors=[{"message": str(e)}]
+            )
+        self.batches.append(result)
+        self.progress.parts_written += result.inserted + result.updated
+        print(f"Loaded {self.progress.parts_written} parts...")
+
+    async def run(self, fzp_files: List[Path]) -> int:
+        """Parse and write every file, returning the number of parts written"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        pending = iter(fzp_files)
+        parse = partial(ingest_fzp_file, parts_root=str(self.parts_root))
+
+        pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+
+            async def parse_files():
+                # Each task keeps one file in flight; the shared iterator
+                # hands out the next path once the previous one is parsed.
+                for fzp_file in pending:
+                    try:
+                        parsed = await loop.run_in_executor(pool, parse, str(fzp_file))
+                    except Exception as e:
+                        print(f"Error processing {fzp_file}: {str(e)}")
+                        parsed = None
+                    if parsed is None:
+                        self.progress.files_failed += 1
+                        continue
+                    self.progress.files_parsed += 1
+                    await queue.put(parsed)
+
+            async def write_parts():
+                batch = []
+                while True:
+                    parsed = await queue.get()
+                    if parsed is None:
+                        break
+                    batch.append(parsed)
+                    if len(batch) >= self.batch_size:
+                        await self._flush(batch)
+                        batch = []
+                if batch:
+                    await self._flush(batch)
+
+            writer_task = asyncio.create_task(write_parts())
+            parsers = [asyncio.create_task(parse_files()) for _ in range(self.max_workers * 2)]
+            try:
+                await asyncio.gather(*parsers)
+                await queue.put(None)
+                await writer_task
+            finally:
+                for task in parsers + [writer_task]:
+                    task.cancel()
+        finally:
+            # Don't block the event loop waiting on workers
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return self.progress.parts_written
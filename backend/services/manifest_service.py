@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReplaceOne
+
+class ManifestService:
+    """Tracks the FZP and SVG inputs each catalog part was built from"""
+
+    def __init__(self, db_collection: AsyncIOMotorCollection):
+        self.collection = db_collection
+
+    async def ensure_indexes(self):
+        """Create the manifest indexes"""
+        await self.collection.create_index("path", unique=True)
+        # Reverse lookup from an SVG to the FZPs that reference it
+        await self.collection.create_index("svgs.path")
+        await self.collection.create_index("svgs.image")
+
+    async def load(self, paths: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the manifest, or just the given FZP paths, keyed by FZP path"""
+        query = {} if paths is None else {"path": {"$in": paths}}
+        cursor = self.collection.find(query, {"_id": 0})
+        entries = await cursor.to_list(length=None)
+        return {entry["path"]: entry for entry in entries}
+
+    async def save(self, entries: List[Dict[str, Any]]):
+        """Upsert manifest entries keyed by FZP path"""
+        if not entries:
+            return
+        await self.collection.bulk_write(
+            [ReplaceOne({"path": entry["path"]}, entry, upsert=True) for entry in entries],
+            ordered=False
+        )
+
+    async def delete(self, paths: List[str]) -> int:
+        """Remove manifest entries for FZP files that no longer exist"""
+        if not paths:
+            return 0
+        result = await self.collection.delete_many({"path": {"$in": paths}})
+        return result.deleted_count
+
+    async def fzp_paths_for_svgs(self, svg_paths: List[str]) -> List[str]:
+        """Find the FZP files that reference any of the given SVG files"""
+        if not svg_paths:
+            return []
+        # A new SVG can satisfy a layer image that was previously missing,
+        # so match on the image name (the path below svg/<source>/) too
+        images = [path.split("/", 2)[2] for path in svg_paths if path.count("/") >= 2]
+        cursor = self.collection.find(
+            {"$or": [{"svgs.path": {"$in": svg_paths}}, {"svgs.image": {"$in": images}}]},
+            {"_id": 0, "path": 1}
+        )
+        entries = await cursor.to_list(length=None)
+        return [entry["path"] for entry in entries]
@@ -0,0 +1,214 @@
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from models.project import Net, NetNode, Netlist
+from services.part_cache import ReadThroughCache
+
+NETLIST_CACHE_SIZE = int(os.environ.get('NETLIST_CACHE_SIZE', 256))
+NETLIST_CACHE_TTL = float(os.environ.get('NETLIST_CACHE_TTL', 3600))
+
+# A connector of a part instance: (PartInstance.id, connector ID)
+Node = Tuple[str, str]
+
+class ProjectNetlist:
+    """Electrical nets of one project, kept up to date wire by wire.
+
+    Nets are the connected components of a union-find over wire endpoints,
+    where each endpoint is also joined to the connectors sharing a bus with
+    it inside its part. Adding a wire is a union; removing one re-links
+    just the nets it was in.
+    """
+
+    def __init__(self):
+        self.revision: Optional[int] = None
+        self.instances: Dict[str, str] = {}  # PartInstance.id -> catalog part
+        self.wires: Dict[str, Tuple[Node, Node]] = {}
+        self.node_wires: Dict[Node, Set[str]] = {}
+        self.parent: Dict[Node, Node] = {}
+        self.members: Dict[Node, Set[Node]] = {}  # root -> nodes in its net
+        # Catalog part ID or module ID -> connector -> connectors on the same buses
+        self.bus_mates: Dict[str, Dict[str, List[str]]] = {}
+        self.netlist: Optional[Netlist] = None
+
+    def find(self, node: Node) -> Node:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: Node, b: Node):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if len(self.members[a]) < len(self.members[b]):
+            a, b = b, a
+        self.parent[b] = a
+        self.members[a] |= self.members.pop(b)
+
+    def add_node(self, node: Node):
+        """Track a connector, joined to the connectors sharing a bus with it"""
+        if node in self.parent:
+            return
+        self.parent[node] = node
+        self.members[node] = {node}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            instance, connector = current
+            for mate in self.bus_mates.get(self.instances.get(instance), {}).get(connector, ()):
+                mate = (instance, mate)
+                if mate not in self.parent:
+                    self.parent[mate] = mate
+                    self.members[mate] = {mate}
+                    stack.append(mate)
+                self.union(current, mate)
+
+    def add_wire(self, wire_id: str, a: Node, b: Node):
+        self.wires[wire_id] = (a, b)
+        for node in (a, b):
+            self.node_wires.setdefault(node, set()).add(wire_id)
+            self.add_node(node)
+        self.union(a, b)
+
+    def remove_wires(self, wire_ids: Iterable[str]):
+        """Drop wires and re-link the nets they were part of"""
+        roots = set()
+        for wire_id in wire_ids:
+            a, b = self.wires.pop(wire_id)
+            roots.add(self.find(a))
+            for node in {a, b}:
+                self.node_wires[node].discard(wire_id)
+                if not self.node_wires[node]:
+                    del self.node_wires[node]
+        nodes = set()
+        for root in roots:
+            nodes |= self.members.pop(root)
+        for node in nodes:
+            del self.parent[node]
+        for node in nodes:
+            for wire_id in self.node_wires.get(node, ()):
+                self.add_wire(wire_id, *self.wires[wire_id])
+
+    def rebuild(self):
+        """Recompute every net from scratch"""
+        wires = self.wires
+        self.wires, self.node_wires, self.parent, self.members = {}, {}, {}, {}
+        for wire_id, (a, b) in wires.items():
+            self.add_wire(wire_id, a, b)
+
+    def update(self, revision: int, instances: Dict[str, str], wires: Dict[str, Tuple[Node, Node]]):
+        """Bring the nets in line with the project as stored at a revision"""
+        if revision == self.revision:
+            return
+        changed = any(instances.get(instance) != part for instance, part in self.instances.items())
+        if not changed:
+            # Wires may already reference an instance that only now exists
+            added = instances.keys() - self.instances.keys()
+            changed = bool(added) and any(instance in added for instance, _ in self.node_wires)
+        self.instances = instances
+        if changed:
+            # Instances were removed or swapped for another part: their buses no longer apply
+            self.wires = dict(wires)
+            self.rebuild()
+        else:
+            removed = [wire_id for wire_id, ends in self.wires.items() if wires.get(wire_id) != ends]
+            if removed:
+                self.remove_wires(removed)
+            for wire_id, (a, b) in wires.items():
+                if wire_id not in self.wires:
+                    self.add_wire(wire_id, a, b)
+        self.revision = revision
+        self.netlist = None
+
+    def to_netlist(self, project_id: str) -> Netlist:
+        """The nets that contain at least one wire, in a stable order"""
+        if self.netlist is None:
+            nets = []
+            for members in self.members.values():
+                wires = sorted({wire_id for node in members for wire_id in self.node_wires.get(node, ())})
+                if wires:
+                    nets.append((sorted(members), wires))
+            nets.sort()
+            self.netlist = Netlist(
+                project_id=project_id,
+                revision=self.revision,
+                nets=[
+                    Net(
+                        id=f"net{index}",
+                        nodes=[NetNode(part_id=instance, connector=connector) for instance, connector in nodes],
+                        wires=wires
+                    )
+                    for index, (nodes, wires) in enumerate(nets)
+                ]
+            )
+        return self.netlist
+
+# Netlists by project ID, shared by every request in this process
+netlist_cache = ReadThroughCache(max_size=NETLIST_CACHE_SIZE, ttl=NETLIST_CACHE_TTL)
+
+class NetlistService:
+    def __init__(
+        self,
+        projects: AsyncIOMotorCollection,
+        parts: AsyncIOMotorCollection,
+        cache: ReadThroughCache = netlist_cache
+    ):
+        self.projects = projects
+        self.parts = parts
+        self.cache = cache
+
+    async def _load_bus_mates(self, part_ids: Set[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Bus mates of each connector of the given catalog parts, by part ID or module ID"""
+        keys = list(part_ids)
+        cursor = self.parts.find(
+            {"$or": [{"id": {"$in": keys}}, {"module_id": {"$in": keys}}]},
+            {"_id": 0, "id": 1, "module_id": 1, "buses": 1}
+        )
+        found: Dict[str, Dict[str, List[str]]] = {part_id: {} for part_id in part_ids}
+        async for part in cursor:
+            mates: Dict[str, List[str]] = {}
+            for bus in part.get("buses", []):
+                for connector in bus["connectors"]:
+                    mates.setdefault(connector, []).extend(c for c in bus["connectors"] if c != connector)
+            for key in (part["id"], part.get("module_id")):
+                if key in found:
+                    found[key] = mates
+        return found
+
+    async def get_netlist(self, project_id: str) -> Optional[Netlist]:
+        """Nets of a project, recomputed only for what changed since the cached revision"""
+        state = self.cache.get(project_id)
+        if state is not None:
+            current = await self.projects.find_one({"id": project_id}, {"_id": 0, "revision": 1})
+            if not current:
+                self.cache.invalidate([project_id])
+                return None
+            if current.get("revision", 0) == state.revision:
+                self.cache.record(hits=1)
+                return state.to_netlist(project_id)
+
+        project = await self.projects.find_one(
+            {"id": project_id},
+            {
+                "_id": 0, "revision": 1, "parts.id": 1, "parts.part_id": 1, "wires.id": 1,
+                "wires.from_part_id": 1, "wires.from_connector": 1, "wires.to_part_id": 1, "wires.to_connector": 1
+            }
+        )
+        if not project:
+            return None
+        self.cache.record(misses=1)
+        instances = {part["id"]: part["part_id"] for part in project.get("parts", [])}
+        wires = {
+            wire["id"]: ((wire["from_part_id"], wire["from_connector"]), (wire["to_part_id"], wire["to_connector"]))
+            for wire in project.get("wires", [])
+        }
+
+        state = state or self.cache.get(project_id) or ProjectNetlist()
+        unknown = set(instances.values()) - state.bus_mates.keys()
+        if unknown:
+            state.bus_mates.update(await self._load_bus_mates(unknown))
+        # Everything from here on is synchronous, so concurrent requests can't interleave
+        state.update(project.get("revision", 0), instances, wires)
+        self.cache.put(project_id, state)
+        return state.to_netlist(project_id)
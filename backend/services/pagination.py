@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    """Raised when a page cursor can't be decoded"""
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+def encode_cursor(key: Optional[List[Any]] = None, offset: Optional[int] = None) -> str:
+    """Encode a sort key, or an offset for ranked results, as an opaque token"""
+    payload = {"k": [_encode_value(value) for value in key]} if key is not None else {"o": offset}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[List[Any]], Optional[int]]:
+    """Decode a token from encode_cursor into (key, offset)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if "k" in payload and isinstance(payload["k"], list):
+            return [_decode_value(value) for value in payload["k"]], None
+        if isinstance(payload.get("o"), int) and payload["o"] >= 0:
+            return None, payload["o"]
+    except (ValueError, TypeError, AttributeError):
+        pass
+    raise InvalidCursor("Invalid page cursor")
+
+def keyset_filter(sort: List[Tuple[str, int]], key: List[Any]) -> Dict[str, Any]:
+    """Query matching documents that sort strictly after key.
+
+    For sort [(a, 1), (b, 1)] and key [x, y] this is
+    a > x OR (a == x AND b > y).
+    """
+    if len(key) != len(sort):
+        raise InvalidCursor("Page cursor does not match the sort order")
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: key[j] for j in range(i)}
+        clause[field] = {"$gt" if direction > 0 else "$lt": key[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def sort_key(document: Dict[str, Any], sort: List[Tuple[str, int]]) -> List[Any]:
+    """Values of the sort fields of a document, for the next page cursor"""
+    return [document.get(field) for field, _ in sort]
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from models.cache import CacheStats
+
+PART_CACHE_SIZE = int(os.environ.get('PART_CACHE_SIZE', 4096))
+PART_CACHE_TTL = float(os.environ.get('PART_CACHE_TTL', 300))
+
+class ReadThroughCache:
+    """In-process LRU cache with a TTL, in front of an async loader.
+
+    Concurrent misses for the same key share one load. Invalidation bumps
+    a generation, so a load that started before it can't store a stale
+    value afterwards. Missing values (None) are not cached.
+    """
+
+    def __init__(self, max_size: int = PART_CACHE_SIZE, ttl: float = PART_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            self.expirations += 1
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries over the limit"""
+        if value is None or self.max_size <= 0:
+            return
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Return the cached value, loading it once however many callers miss at the same time"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The request doing the load went away; load it ourselves
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get_or_load(key, loader)
+                raise
+
+        self.misses += 1
+        generation = self.generation
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+        if generation == self.generation:
+            self.put(key, value)
+        future.set_result(value)
+        return value
+
+    def record(self, hits: int = 0, misses: int = 0):
+        """Count lookups made outside get_or_load"""
+        self.hits += hits
+        self.misses += misses
+
+    def invalidate(self, keys: Iterable[str]):
+        """Drop the given keys"""
+        self.generation += 1
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self.generation += 1
+        self.entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Current size and lifetime counters"""
+        return CacheStats(
+            size=len(self.entries),
+            max_size=self.max_size,
+            ttl=self.ttl,
+            hits=self.hits,
+            misses=self.misses,
+            coalesced=self.coalesced,
+            evictions=self.evictions,
+            expirations=self.expirations
+        )
+
+# Parts by ID, shared by every request in this process
+part_cache = ReadThroughCache()
@@ -1,46 +1,306 @@
+import asyncio
 import os
-import xml.etree.ElementTree as ET
-from typing import List, Optional, Dict, Any
+import uuid
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Any, Iterable, Set, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorCollection
-from models.part import FritzingPart, PartCreate, PartUpdate, Connector
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from models.part import FritzingPart, PartCreate, PartUpdate, PartReplacement, PartSummary, PartFacetResults, PartBatchResult
+from models.ingest import IngestBatchResult, IngestProgress, IngestReport
+from services.fzp_parser import parse_fzp_file, read_archive_image, manifest_entry_unchanged, manifest_content_equal, PART_SOURCES, PART_FILE_SUFFIXES
+from services.ingestion import IngestionPipeline, INGEST_BATCH_SIZE
+from services.manifest_service import ManifestService
+from services.replacement_service import ReplacementService
+from services.catalog_snapshot import load_snapshot, SNAPSHOT_PATH
+from services.facet_index import DEFAULT_FACET_KEYS
+from services.part_cache import part_cache
+from services.catalog_revision import CatalogRevision
+from services.search_index import PartSearchIndex, part_search_index
+from services.pagination import decode_cursor, encode_cursor, keyset_filter, sort_key, InvalidCursor
+from services.units import build_range_query, numeric_properties
+from services.text_search import build_search_query, search_terms, TEXT_INDEX_WEIGHTS, TEXT_INDEX_NAME
+
+# Ingests changing more parts than this rebuild the search index off the event loop
+# instead of updating it part by part
+SEARCH_INDEX_REBUILD_SIZE = int(os.environ.get('SEARCH_INDEX_REBUILD_SIZE', 1000))
+
+# Fields the in-memory search index is built from
+SEARCH_INDEX_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "tags": 1, "properties": 1, "connectors.name": 1, "source": 1
+}
+
+# Fields the part library sidebar shows; connector IDs are only fetched to be counted
+PART_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "module_id": 1, "title": 1, "description": 1, "tags": 1,
+    "image_path": 1, "source": 1, "properties.family": 1, "connectors.id": 1
+}
+
+# Stored part documents minus the fields only used for querying
+PART_DOCUMENT_PROJECTION = {"_id": 0, "search_terms": 0, "numeric_properties": 0}
+
+# Values for fields missing from documents written before the fields existed
+PART_DEFAULTS = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in FritzingPart.model_fields.items()
+    if not field.is_required() and field.default_factory in (None, list, dict)
+}
+
+# Stable listing order; keyset cursors seek on these fields
+PART_SORT = [("title", 1), ("id", 1)]
+
+# Namespace for deterministic IDs of parts loaded from the parts library
+CATALOG_NAMESPACE = uuid.UUID("6f1c8e3a-2d4b-5a7e-9c1f-0b3d5e7a9c2f")
+
+def part_projection(fields: List[str]) -> Dict[str, int]:
+    """Mongo projection returning only the given part fields (plus the ID)"""
+    projection = {"_id": 0, "id": 1}
+    for field in fields:
+        if field.split(".", 1)[0] not in FritzingPart.model_fields:
+            raise ValueError(f"Unknown part field: {field}")
+        projection[field] = 1
+    return projection
+
+def part_summary(document: Dict[str, Any]) -> PartSummary:
+    """Build a summary from a document read with PART_SUMMARY_PROJECTION"""
+    connectors = document.pop("connectors", None) or []
+    return PartSummary(**document, connector_count=len(connectors))
 
 class PartService:
     def __init__(self, db_collection: AsyncIOMotorCollection):
         self.collection = db_collection
+        self.manifest = ManifestService(db_collection.database.fritzing_parts_manifest)
+        self.replacements = ReplacementService(db_collection.database.part_replacements)
+        self.search_index = part_search_index
+        self.cache = part_cache
+        self.revision = CatalogRevision(db_collection.database.catalog_meta)
         self.fritzing_parts_path = Path("/app/public/parts")
+        self.snapshot_path: Optional[Path] = SNAPSHOT_PATH
+        # Part IDs the current ingest run has written to or deleted from the catalog
+        self.written_part_ids: Set[str] = set()
+        self.removed_part_ids: Set[str] = set()
 
-    async def get_all_parts(self, skip: int = 0, limit: int = 100, search: Optional[str] = None, family: Optional[str] = None) -> List[FritzingPart]:
-        """Get all parts with optional filtering"""
+    async def get_all_parts(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        family: Optional[str] = None,
+        include_obsolete: bool = False,
+        cursor: Optional[str] = None,
+        view: str = "full",
+        fields: Optional[List[str]] = None,
+        ranges: Optional[List[str]] = None,
+        trusted: bool = False
+    ) -> Tuple[List[Union[FritzingPart, PartSummary, Dict[str, Any]]], Optional[str]]:
+        """Get a page of parts with optional filtering, and the cursor of the next page.
+
+        The summary view returns PartSummary models; a fields list returns
+        plain documents holding only those fields. Either way the
+        projection is applied by Mongo, so unrequested fields are never read.
+        Ranges such as "capacitance>=10nF" filter on the parsed numeric
+        property values. Trusted callers get full parts as the stored
+        documents, skipping model validation.
+        """
+        if fields:
+            projection = part_projection(fields)
+        elif view == "summary":
+            projection = PART_SUMMARY_PROJECTION
+        elif trusted:
+            projection = PART_DOCUMENT_PROJECTION
+        else:
+            projection = None
+        
+        parts, next_cursor = await self._find_parts(
+            skip, limit, search, family, include_obsolete, cursor, projection, ranges
+        )
+        if fields:
+            return parts, next_cursor
+        if view == "summary":
+            return [part_summary(part) for part in parts], next_cursor
+        if trusted:
+            return [{**PART_DEFAULTS, **part} for part in parts], next_cursor
+        return [FritzingPart(**part) for part in parts], next_cursor
+
+    async def _find_parts(
+        self,
+        skip: int,
+        limit: int,
+        search: Optional[str],
+        family: Optional[str],
+        include_obsolete: bool,
+        cursor: Optional[str],
+        projection: Optional[Dict[str, Any]],
+        ranges: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Read a page of raw part documents, and the cursor of the next page"""
+        after, offset = decode_cursor(cursor) if cursor else (None, None)
+        if offset is not None:
+            skip = offset
+        range_query = build_range_query(ranges) if ranges else {}
+        
+        # The in-memory index has no numeric values, so range filters go to Mongo
+        if search and self.search_index.ready and not range_query:
+            if after is not None:
+                raise InvalidCursor("Page cursor does not match the sort order")
+            part_ids = self.search_index.search(
+                search,
+                skip=skip,
+                limit=limit,
+                family=family,
+                include_obsolete=include_obsolete
+            )
+            parts = await self._get_documents_in_order(part_ids, projection)
+            next_cursor = encode_cursor(offset=skip + limit) if len(part_ids) == limit else None
+            return parts, next_cursor
+        
         query = {}
         
+        if not include_obsolete:
+            query["source"] = {"$ne": "obsolete"}
+        
+        ranked = False
         if search:
-            query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}},
-                {"tags": {"$regex": search, "$options": "i"}}
-            ]
+            search_query, ranked = build_search_query(search)
+            query.update(search_query)
         
         if family and family != "all":
             query["properties.family"] = {"$regex": family, "$options": "i"}
         
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        parts = await cursor.to_list(length=limit)
+        query.update(range_query)
         
-        return [FritzingPart(**part) for part in parts]
+        # The cursor needs the sort key of the last row even if it wasn't asked for
+        inclusive = projection is not None and any(value == 1 for field, value in projection.items() if field != "_id")
+        key_fields = [field for field, _ in PART_SORT if inclusive and field not in projection]
+        if key_fields:
+            projection = {**projection, **{field: 1 for field in key_fields}}
+        
+        if ranked:
+            if after is not None:
+                raise InvalidCursor("Page cursor does not match the sort order")
+            # Best text matches first, as weighted by the text index
+            score = {"score": {"$meta": "textScore"}}
+            results = self.collection.find(query, {**(projection or {}), **score})
+            results = results.sort([("score", {"$meta": "textScore"})]).skip(skip)
+        else:
+            if after is not None:
+                # Seek past the last part of the previous page instead of skipping
+                query = {"$and": [query, keyset_filter(PART_SORT, after)]}
+            results = self.collection.find(query, projection).sort(PART_SORT)
+            if after is None:
+                results = results.skip(skip)
+        parts = await results.limit(limit).to_list(length=limit)
+        
+        next_cursor = None
+        if len(parts) == limit:
+            if ranked:
+                next_cursor = encode_cursor(offset=skip + limit)
+            else:
+                next_cursor = encode_cursor(sort_key(parts[-1], PART_SORT))
+        if ranked and projection:
+            for part in parts:
+                part.pop("score", None)
+        for field in key_fields:
+            for part in parts:
+                part.pop(field, None)
+        return parts, next_cursor
+
+    async def _get_documents_in_order(
+        self,
+        part_ids: List[str],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Fetch part documents by ID, keeping the order of the IDs"""
+        if not part_ids:
+            return []
+        cursor = self.collection.find({"id": {"$in": part_ids}}, projection)
+        parts = {part["id"]: part for part in await cursor.to_list(length=len(part_ids))}
+        return [parts[part_id] for part_id in part_ids if part_id in parts]
+
+    async def faceted_search(
+        self,
+        search: Optional[str] = None,
+        selections: Optional[Dict[str, List[str]]] = None,
+        facet_keys: Iterable[str] = DEFAULT_FACET_KEYS,
+        skip: int = 0,
+        limit: int = 100,
+        include_obsolete: bool = False,
+        view: str = "summary"
+    ) -> Optional[PartFacetResults]:
+        """Search parts by text and exact property values, with value counts per facet.
+
+        Answered from the in-memory index; returns None until it has loaded.
+        """
+        if not self.search_index.ready:
+            return None
+        part_ids, total, facets = self.search_index.faceted_search(
+            search,
+            {key.lower(): values for key, values in (selections or {}).items()},
+            [key.lower() for key in facet_keys],
+            skip=skip,
+            limit=limit,
+            include_obsolete=include_obsolete
+        )
+        if view == "summary":
+            documents = await self._get_documents_in_order(part_ids, PART_SUMMARY_PROJECTION)
+            parts = [part_summary(document) for document in documents]
+        else:
+            parts = [FritzingPart(**document) for document in await self._get_documents_in_order(part_ids)]
+        return PartFacetResults(parts=parts, total=total, facets=facets)
 
     async def get_part_by_id(self, part_id: str) -> Optional[FritzingPart]:
         """Get a specific part by ID"""
+        return await self.cache.get_or_load(part_id, lambda: self._load_part(part_id))
+
+    async def _load_part(self, part_id: str) -> Optional[FritzingPart]:
         part = await self.collection.find_one({"id": part_id})
         if part:
             return FritzingPart(**part)
         return None
 
+    async def get_archive_image(self, archive: str, image: str) -> Optional[bytes]:
+        """Read a layer image bundled in one of the catalog's .fzpz parts"""
+        return await asyncio.to_thread(read_archive_image, self.fritzing_parts_path, archive, image)
+
+    async def get_parts_batch(self, keys: List[str]) -> PartBatchResult:
+        """Resolve many part IDs or module IDs in one query"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return PartBatchResult()
+        found: Dict[str, FritzingPart] = {}
+        for key in keys:
+            part = self.cache.get(key)
+            if part is not None:
+                found[key] = part
+        lookup = [key for key in keys if key not in found]
+        self.cache.record(hits=len(found), misses=len(lookup))
+        if lookup:
+            # As in get_or_load: parts read before an invalidation must not be cached
+            generation = self.cache.generation
+            cursor = self.collection.find({"$or": [{"id": {"$in": lookup}}, {"module_id": {"$in": lookup}}]})
+            async for document in cursor:
+                part = FritzingPart(**document)
+                if generation == self.cache.generation:
+                    self.cache.put(part.id, part)
+                found[part.id] = part
+                if part.module_id:
+                    found.setdefault(part.module_id, part)
+        return PartBatchResult(
+            parts={key: found[key] for key in keys if key in found},
+            missing=[key for key in keys if key not in found]
+        )
+
     async def create_part(self, part_data: PartCreate) -> FritzingPart:
         """Create a new part"""
         part = FritzingPart(**part_data.dict())
-        await self.collection.insert_one(part.dict())
+        document = part.dict()
+        document["search_terms"] = search_terms(part.title, part.tags)
+        document["numeric_properties"] = numeric_properties(part.properties)
+        await self.collection.insert_one(document)
+        await self.revision.bump()
+        self.search_index.add(document)
         return part
 
     async def update_part(self, part_id: str, part_data: PartUpdate) -> Optional[FritzingPart]:
@@ -51,156 +311,413 @@ class PartService:
         
         update_data["updated_at"] = datetime.utcnow()
         
+        if "properties" in update_data:
+            update_data["numeric_properties"] = numeric_properties(update_data["properties"])
+        
+        if "title" in update_data or "tags" in update_data:
+            current = await self.collection.find_one({"id": part_id}, {"title": 1, "tags": 1})
+            if not current:
+                return None
+            update_data["search_terms"] = search_terms(
+                update_data.get("title", current.get("title")),
+                update_data.get("tags", current.get("tags"))
+            )
+        
         result = await self.collection.update_one(
             {"id": part_id},
             {"$set": update_data}
         )
+        self.cache.invalidate([part_id])
         
         if result.modified_count:
-            return await self.get_part_by_id(part_id)
+            await self.revision.bump()
+            part = await self.get_part_by_id(part_id)
+            if part:
+                self.search_index.add(part.dict())
+            return part
         return None
 
     async def delete_part(self, part_id: str) -> bool:
         """Delete a part"""
         result = await self.collection.delete_one({"id": part_id})
+        self.cache.invalidate([part_id])
+        self.search_index.remove(part_id)
+        if result.deleted_count:
+            await self.revision.bump()
         return result.deleted_count > 0
 
     def parse_fzp_file(self, fzp_path: str) -> Optional[Dict[str, Any]]:
         """Parse a .fzp file and extract component information"""
+        return parse_fzp_file(fzp_path)
+
+    def _catalog_document(self, part_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the stored document for a parsed catalog part"""
+        # Derive the ID from the module ID so reloads keep part references stable
+        part_id = str(uuid.uuid5(CATALOG_NAMESPACE, part_data["module_id"]))
+        document = FritzingPart(id=part_id, **part_data).dict()
+        document["search_terms"] = search_terms(document["title"], document["tags"])
+        document["numeric_properties"] = numeric_properties(document["properties"])
+        return document
+
+    async def _upsert_parts(self, batch_number: int, batch: List[Dict[str, Any]]) -> IngestBatchResult:
+        """Upsert one batch of parsed parts keyed on module_id"""
+        result = IngestBatchResult(batch=batch_number, submitted=len(batch))
+        # Without a module ID there is nothing to key the upsert on
+        for part_data in batch:
+            if not part_data.get("module_id"):
+                result.errors.append({"module_id": "", "message": f"Part '{part_data.get('title')}' has no module ID"})
+        batch = [part_data for part_data in batch if part_data.get("module_id")]
+        if not batch:
+            return result
+        
+        documents = [self._catalog_document(part_data) for part_data in batch]
+        self.written_part_ids.update(document["id"] for document in documents)
+        operations = [
+            ReplaceOne({"module_id": document["module_id"]}, document, upsert=True)
+            for document in documents
+        ]
+        
         try:
-            if not os.path.exists(fzp_path):
-                return None
-                
-            tree = ET.parse(fzp_path)
-            root = tree.getroot()
-            
-            if root.tag != 'module':
-                return None
-            
-            # Extract basic information
-            title = root.find('title')
-            title_text = title.text if title is not None else ''
-            
-            description = root.find('description')
-            description_text = description.text if description is not None else ''
-            
-            author = root.find('author')
-            author_text = author.text if author is not None else ''
-            
-            # Extract properties
-            properties = {}
-            properties_elem = root.find('properties')
-            if properties_elem is not None:
-                for prop in properties_elem.findall('property'):
-                    name = prop.get('name')
-                    value = prop.text
-                    if name and value:
-                        properties[name] = value
-            
-            # Extract tags
-            tags = []
-            tags_elem = root.find('tags')
-            if tags_elem is not None:
-                for tag in tags_elem.findall('tag'):
-                    if tag.text:
-                        tags.append(tag.text)
-            
-            # Extract image path for breadboard view
-            image_path = ""
-            breadboard_view = root.find('.//breadboardView')
-            if breadboard_view is not None:
-                layers = breadboard_view.find('layers')
-                if layers is not None:
-                    image_attr = layers.get('image')
-                    if image_attr:
-                        image_path = f"/parts/svg/core/{image_attr}"
-            
-            # Extract connectors
-            connectors = []
-            for connector_elem in root.findall('.//connector'):
-                connector_id = connector_elem.get('id', '')
-                connector_name = connector_elem.get('name', '')
-                connector_type = connector_elem.get('type', '')
-                
-                desc_elem = connector_elem.find('description')
-                connector_desc = desc_elem.text if desc_elem is not None else ''
-                
-                # Get breadboard view info
-                breadboard_p = connector_elem.find('.//breadboardView/p')
-                svg_id = breadboard_p.get('svgId', '') if breadboard_p is not None else ''
-                terminal_id = breadboard_p.get('terminalId', '') if breadboard_p is not None else ''
-                
-                connectors.append(Connector(
-                    id=connector_id,
-                    name=connector_name,
-                    type=connector_type,
-                    description=connector_desc,
-                    svg_id=svg_id,
-                    terminal_id=terminal_id
-                ))
-            
-            return {
-                "module_id": root.get('moduleId', ''),
-                "title": title_text,
-                "description": description_text,
-                "author": author_text,
-                "properties": properties,
-                "tags": tags,
-                "image_path": image_path,
-                "connectors": [connector.dict() for connector in connectors]
-            }
-            
-        except Exception as e:
-            print(f"Error parsing FZP file {fzp_path}: {str(e)}")
-            return None
+            write_result = await self.collection.bulk_write(operations, ordered=False)
+            details = write_result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for error in details.get("writeErrors", []):
+                result.errors.append({
+                    "module_id": batch[error["index"]]["module_id"],
+                    "code": error.get("code"),
+                    "message": error.get("errmsg", "")
+                })
+            print(f"Batch {batch_number}: {len(result.errors)} of {len(batch)} parts failed to write")
+        
+        self.cache.invalidate(document["id"] for document in documents)
+        await self.revision.bump()
+        
+        result.inserted = details.get("nUpserted", 0)
+        result.updated = details.get("nMatched", 0)
+        return result
+
+    async def _write_batch(
+        self,
+        batch_number: int,
+        batch: List[Dict[str, Any]],
+        previous: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> IngestBatchResult:
+        """Write one batch of ingested files, skipping parts whose inputs hash the same as before"""
+        changed = []
+        unchanged = 0
+        for item in batch:
+            old = previous.get(item["manifest"]["path"]) if previous is not None else None
+            if old and old["module_id"] == item["manifest"]["module_id"] and manifest_content_equal(old, item["manifest"]):
+                unchanged += 1
+            else:
+                changed.append(item["part"])
+        
+        result = await self._upsert_parts(batch_number, changed)
+        result.submitted = len(batch)
+        result.unchanged = unchanged
+        
+        # Parts that failed to write are left out so the next incremental load retries them;
+        # entries identical to the stored ones aren't written again
+        failed = {error["module_id"] for error in result.errors}
+        await self.manifest.save([
+            item["manifest"] for item in batch
+            if item["manifest"]["module_id"] not in failed
+            and (previous is None or previous.get(item["manifest"]["path"]) != item["manifest"])
+        ])
+        return result
+
+    async def bulk_upsert_parts(self, parts: List[Dict[str, Any]], batch_size: int = INGEST_BATCH_SIZE) -> List[IngestBatchResult]:
+        """Upsert parsed parts in unordered bulk batches"""
+        batch_size = max(1, batch_size)
+        results = []
+        for start in range(0, len(parts), batch_size):
+            results.append(await self._upsert_parts(len(results), parts[start:start + batch_size]))
+        return results
+
+    async def ensure_indexes(self):
+        """Create the indexes catalog reads and ingestion rely on"""
+        await self.manifest.ensure_indexes()
+        await self.replacements.ensure_indexes()
+        await self.collection.create_index("id", unique=True)
+        # Parts created through the API may have no module ID
+        await self.collection.create_index(
+            "module_id",
+            unique=True,
+            partialFilterExpression={"module_id": {"$gt": ""}}
+        )
+        await self.collection.create_index("source")
+        await self.collection.create_index(PART_SORT)
+        await self.collection.create_index(
+            [(field, "text") for field in TEXT_INDEX_WEIGHTS],
+            weights=TEXT_INDEX_WEIGHTS,
+            name=TEXT_INDEX_NAME
+        )
+        await self.collection.create_index("search_terms")
+        await self.collection.create_index([("numeric_properties.name", 1), ("numeric_properties.value", 1)])
+
+    async def backfill_numeric_properties(self) -> int:
+        """Parse numeric property values for parts stored before they were indexed"""
+        cursor = self.collection.find(
+            {"numeric_properties": {"$exists": False}},
+            {"_id": 0, "id": 1, "properties": 1}
+        )
+        updates = [
+            UpdateOne({"id": part["id"]}, {"$set": {"numeric_properties": numeric_properties(part.get("properties"))}})
+            async for part in cursor
+        ]
+        if updates:
+            await self.collection.bulk_write(updates, ordered=False)
+            print(f"Indexed numeric properties of {len(updates)} parts")
+        return len(updates)
 
-    async def load_fritzing_parts(self, force_reload: bool = False) -> int:
+    async def load_fritzing_parts(
+        self,
+        force_reload: bool = False,
+        batch_size: Optional[int] = None,
+        incremental: bool = False,
+        progress: Optional[IngestProgress] = None
+    ) -> IngestReport:
         """Load parts from the fritzing-parts repository"""
-        if not force_reload:
+        if not force_reload and not incremental:
             # Check if parts already exist
             count = await self.collection.count_documents({})
             if count > 0:
-                return count
+                return IngestReport(parts_loaded=count)
         
-        parts_loaded = 0
-        core_path = self.fritzing_parts_path / "core"
+        parts_root = self.fritzing_parts_path
+        fzp_files = await asyncio.to_thread(self.scan_fzp_files, parts_root)
+        if not fzp_files:
+            return IngestReport()
         
-        if not core_path.exists():
-            return 0
+        report = IngestReport(files_scanned=len(fzp_files))
+        progress = progress or IngestProgress()
+        progress.files_scanned = len(fzp_files)
+        
+        if not incremental and self.snapshot_path:
+            # A current snapshot replaces XML parsing altogether
+            items = await asyncio.to_thread(load_snapshot, self.snapshot_path, parts_root, fzp_files)
+            if items is not None:
+                async with self._catalog_writes():
+                    await self._write_snapshot_items(items, report, batch_size or INGEST_BATCH_SIZE, progress)
+                return report
+        
+        previous = None
+        if incremental:
+            # Only files whose own or SVG mtime/size moved get parsed (and hashed) again
+            previous = await self.manifest.load()
+            current_paths = {fzp_file.relative_to(parts_root).as_posix(): fzp_file for fzp_file in fzp_files}
+            await self.manifest.delete([path for path in previous if path not in current_paths])
+            unchanged_paths = await asyncio.to_thread(lambda: {
+                path for path in current_paths
+                if path in previous and manifest_entry_unchanged(previous[path], parts_root)
+            })
+            fzp_files = [fzp_file for path, fzp_file in current_paths.items() if path not in unchanged_paths]
+            report.unchanged = len(unchanged_paths)
+        
+        async with self._catalog_writes():
+            await self._ingest(fzp_files, report, previous, batch_size, progress)
+            if incremental:
+                report.removed = await self._remove_stale_parts(previous)
+        return report
+
+    @staticmethod
+    def scan_fzp_files(parts_root: Path) -> List[Path]:
+        """List the FZP and FZPZ files in every source folder of the parts library"""
+        fzp_files = []
+        for source in PART_SOURCES:
+            source_path = parts_root / source
+            if source_path.is_dir():
+                fzp_files.extend(sorted(
+                    path for path in source_path.rglob("*") if path.suffix in PART_FILE_SUFFIXES
+                ))
+        return fzp_files
+
+    async def _write_snapshot_items(
+        self,
+        items: List[Dict[str, Any]],
+        report: IngestReport,
+        batch_size: int,
+        progress: IngestProgress
+    ):
+        """Write pre-parsed snapshot items straight to the catalog.
+
+        Parts whose manifest entry matches the stored one (same file hashes,
+        same parser) and which are still in the catalog are left as they are.
+        """
+        report.from_snapshot = True
+        progress.files_parsed = len(items)
+        stored = set(await self.collection.distinct("module_id"))
+        previous = {
+            path: entry for path, entry in (await self.manifest.load()).items()
+            if entry["module_id"] in stored
+        }
+        for start in range(0, len(items), batch_size):
+            result = await self._write_batch(len(report.batches), items[start:start + batch_size], previous)
+            report.batches.append(result)
+            progress.parts_written += result.inserted + result.updated
+        
+        report.parts_loaded = progress.parts_written
+        report.added = sum(batch.inserted for batch in report.batches)
+        report.updated = sum(batch.updated for batch in report.batches)
+        report.unchanged = sum(batch.unchanged for batch in report.batches)
+
+    async def _ingest(
+        self,
+        fzp_files: List[Path],
+        report: IngestReport,
+        previous: Optional[Dict[str, Dict[str, Any]]] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[IngestProgress] = None
+    ):
+        """Run FZP files through the ingestion pipeline and fold the results into a report"""
+        progress = progress or IngestProgress()
+        # Parsing runs in a process pool so the event loop keeps serving requests
+        pipeline = IngestionPipeline(
+            writer=lambda batch_number, batch: self._write_batch(batch_number, batch, previous),
+            parts_root=self.fritzing_parts_path,
+            batch_size=batch_size,
+            progress=progress
+        )
+        if fzp_files:
+            await pipeline.run(fzp_files)
         
-        # Process .fzp files
-        for fzp_file in core_path.glob("*.fzp"):
+        report.parts_loaded = progress.parts_written
+        report.files_failed = progress.files_failed
+        report.batches = pipeline.batches
+        report.added = sum(batch.inserted for batch in pipeline.batches)
+        report.updated = sum(batch.updated for batch in pipeline.batches)
+        report.unchanged += sum(batch.unchanged for batch in pipeline.batches)
+
+    async def _remove_stale_parts(self, previous: Dict[str, Dict[str, Any]]) -> int:
+        """Drop parts whose file disappeared or now declares a different module ID"""
+        current = await self.manifest.load()
+        live = {entry["module_id"] for entry in current.values()}
+        stale = {
+            entry["module_id"] for path, entry in previous.items()
+            if path not in current or current[path]["module_id"] != entry["module_id"]
+        } - live
+        if not stale:
+            return 0
+        query = {"module_id": {"$in": list(stale)}}
+        self.removed_part_ids.update([document["id"] async for document in self.collection.find(query, {"_id": 0, "id": 1})])
+        result = await self.collection.delete_many(query)
+        return result.deleted_count
+
+    async def reingest_files(self, changed_paths: List[Path]) -> IngestReport:
+        """Re-ingest the parts affected by changed FZP or SVG files"""
+        parts_root = self.fritzing_parts_path
+        fzp_paths = set()
+        svg_paths = set()
+        for changed_path in changed_paths:
             try:
-                part_data = self.parse_fzp_file(str(fzp_file))
-                if part_data:
-                    # Check if part already exists
-                    existing = await self.collection.find_one({"module_id": part_data["module_id"]})
-                    if not existing or force_reload:
-                        part = FritzingPart(**part_data)
-                        if existing and force_reload:
-                            await self.collection.replace_one({"id": existing["id"]}, part.dict())
-                        else:
-                            await self.collection.insert_one(part.dict())
-                        parts_loaded += 1
-                        
-                        if parts_loaded % 100 == 0:
-                            print(f"Loaded {parts_loaded} parts...")
-                            
-            except Exception as e:
-                print(f"Error processing {fzp_file}: {str(e)}")
+                path = Path(changed_path).relative_to(parts_root).as_posix()
+            except ValueError:
                 continue
+            if path.endswith(PART_FILE_SUFFIXES):
+                fzp_paths.add(path)
+            elif path.endswith(".svg"):
+                svg_paths.add(path)
         
-        return parts_loaded
+        # SVGs map back to the parts that use them through the manifest
+        fzp_paths.update(await self.manifest.fzp_paths_for_svgs(list(svg_paths)))
+        if not fzp_paths:
+            return IngestReport()
+        
+        previous = await self.manifest.load(list(fzp_paths))
+        existing = [parts_root / path for path in sorted(fzp_paths) if (parts_root / path).is_file()]
+        await self.manifest.delete([path for path in fzp_paths if not (parts_root / path).is_file()])
+        
+        report = IngestReport(files_scanned=len(existing))
+        async with self._catalog_writes():
+            await self._ingest(existing, report, previous)
+            report.removed = await self._remove_stale_parts(previous)
+        return report
+
+    @asynccontextmanager
+    async def _catalog_writes(self):
+        """Run ingestion writes, then refresh derived state if any were made.
+
+        The refresh also runs when ingestion fails or is cancelled part-way,
+        and is shielded from cancellation: the manifest is saved per batch,
+        so a later reload would see those parts as unchanged and never
+        refresh for them.
+        """
+        self.written_part_ids, self.removed_part_ids = set(), set()
+        try:
+            yield
+        finally:
+            if self.written_part_ids or self.removed_part_ids:
+                await asyncio.shield(self._catalog_changed(self.written_part_ids, self.removed_part_ids))
+
+    async def _catalog_changed(self, written: Set[str], removed: Set[str]):
+        """Refresh what is derived from the catalog after ingestion wrote or removed parts"""
+        self.cache.clear()
+        await self.revision.bump()
+        await self.rebuild_replacements()
+        await self.update_search_index(written, removed)
+
+    async def update_search_index(self, written: Set[str], removed: Set[str]):
+        """Re-index just the parts an ingest wrote or removed.
+
+        The index is rebuilt instead when it hasn't been built yet, or when
+        so many parts changed that updating it in place would hold up the
+        event loop.
+        """
+        if not self.search_index.ready or len(written) + len(removed) > SEARCH_INDEX_REBUILD_SIZE:
+            await self.refresh_search_index()
+            return
+        cursor = self.collection.find({"id": {"$in": list(written)}}, SEARCH_INDEX_PROJECTION)
+        parts = await cursor.to_list(length=None)
+        # Parts that failed to write, or were written and then removed, drop out too
+        for part_id in (written | removed) - {part["id"] for part in parts}:
+            self.search_index.remove(part_id)
+        for part in parts:
+            self.search_index.add(part)
+
+    async def refresh_search_index(self):
+        """Rebuild the in-memory search index from the catalog"""
+        cursor = self.collection.find({}, SEARCH_INDEX_PROJECTION)
+        parts = await cursor.to_list(length=None)
+        # Build off the event loop, then swap it in all at once
+        index = await asyncio.to_thread(PartSearchIndex.build, parts)
+        self.search_index.replace_with(index)
+
+    async def rebuild_replacements(self):
+        """Rebuild the replaced-by graph from the catalog"""
+        cursor = self.collection.find(
+            {"replaced_by": {"$gt": ""}},
+            {"_id": 0, "module_id": 1, "replaced_by": 1}
+        )
+        parts = await cursor.to_list(length=None)
+        await self.replacements.rebuild({part["module_id"]: part["replaced_by"] for part in parts})
+
+    async def resolve_replacement(self, module_id: str) -> PartReplacement:
+        """Resolve a module ID to the part that currently replaces it"""
+        return await self.replacements.resolve(module_id)
+
+    async def resolve_replacements(self, module_ids: List[str]) -> Dict[str, str]:
+        """Resolve many module IDs to their current replacements"""
+        return await self.replacements.resolve_many(module_ids)
 
     async def get_part_families(self) -> List[str]:
-        """Get all unique part families"""
+        """Get the families of parts that aren't obsolete, as the library lists them.
+
+        Values are stripped and blank ones dropped, the same way the search
+        index counts them, so both paths return the same list.
+        """
+        if self.search_index.ready:
+            return sorted(self.search_index.facets.current_counts.get("family", {}))
+        
         pipeline = [
-            {"$group": {"_id": "$properties.family"}},
-            {"$match": {"_id": {"$ne": None}}},
-            {"$sort": {"_id": 1}}
+            {"$match": {"source": {"$ne": "obsolete"}}},
+            {"$group": {"_id": "$properties.family"}}
         ]
         
         cursor = self.collection.aggregate(pipeline)
         families = await cursor.to_list(length=None)
         
-        return [family["_id"] for family in families if family["_id"]]
\ No newline at end of file
+        return sorted({
+            family["_id"].strip() for family in families
+            if isinstance(family["_id"], str) and family["_id"].strip()
+        })
\ No newline at end of file
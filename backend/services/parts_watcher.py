@@ -0,0 +1,132 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from services.part_service import PartService
+from services.ingest_jobs import ingest_jobs
+from services.fzp_parser import PART_SOURCES, PART_FILE_SUFFIXES
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+WATCH_DEBOUNCE = float(os.environ.get('PARTS_WATCH_DEBOUNCE', 1.0))
+WATCH_POLL_INTERVAL = float(os.environ.get('PARTS_WATCH_POLL_INTERVAL', 5.0))
+
+class PartsWatcher:
+    """Watches the parts library and re-ingests the parts whose files change.
+
+    Uses inotify when it is available and falls back to polling mtimes.
+    Changes are collected until the library has been quiet for the debounce
+    interval, so a git checkout touching hundreds of files triggers one
+    re-ingest instead of hundreds.
+    """
+
+    def __init__(self, service: PartService, debounce: Optional[float] = None, poll_interval: Optional[float] = None):
+        self.service = service
+        self.debounce = debounce or WATCH_DEBOUNCE
+        self.poll_interval = poll_interval or WATCH_POLL_INTERVAL
+        self.changed: Set[Path] = set()
+        self.changed_event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def watch_dirs(self) -> List[Path]:
+        """Directories whose FZP and SVG files feed the catalog"""
+        parts_root = self.service.fritzing_parts_path
+        dirs = []
+        for source in PART_SOURCES:
+            dirs.append(parts_root / source)
+            svg_root = parts_root / "svg" / source
+            if svg_root.is_dir():
+                dirs.extend(sorted(path for path in svg_root.iterdir() if path.is_dir()))
+        return [path for path in dirs if path.is_dir()]
+
+    async def start(self):
+        """Start watching in the background"""
+        if not self.task:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop watching"""
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def _notify(self, paths):
+        for path in paths:
+            if path.suffix in PART_FILE_SUFFIXES or path.suffix == ".svg":
+                self.changed.add(path)
+                self.changed_event.set()
+
+    async def _run(self):
+        inotify = None
+        if INotify is not None:
+            try:
+                inotify = INotify()
+            except OSError:
+                # Not on Linux, or out of inotify instances
+                inotify = None
+        print(f"Watching parts library for changes ({'inotify' if inotify else 'polling'})")
+        watch = self._watch_inotify(inotify) if inotify else self._watch_polling()
+        await asyncio.gather(watch, self._debounce_changes())
+
+    async def _watch_inotify(self, inotify):
+        loop = asyncio.get_running_loop()
+        mask = flags.CLOSE_WRITE | flags.CREATE | flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO
+        watches = {inotify.add_watch(str(path), mask): path for path in self.watch_dirs()}
+        
+        def on_readable():
+            self._notify(watches[event.wd] / event.name for event in inotify.read(timeout=0) if event.wd in watches)
+        
+        loop.add_reader(inotify.fileno(), on_readable)
+        try:
+            await asyncio.Future()
+        finally:
+            loop.remove_reader(inotify.fileno())
+            inotify.close()
+
+    def _snapshot(self) -> Dict[Path, Tuple[float, int]]:
+        snapshot = {}
+        for directory in self.watch_dirs():
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.endswith(PART_FILE_SUFFIXES + (".svg",)):
+                    stat = entry.stat()
+                    snapshot[Path(entry.path)] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    async def _watch_polling(self):
+        snapshot = await asyncio.to_thread(self._snapshot)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = await asyncio.to_thread(self._snapshot)
+            self._notify(path for path in snapshot.keys() | current.keys() if snapshot.get(path) != current.get(path))
+            snapshot = current
+
+    async def _debounce_changes(self):
+        while True:
+            await self.changed_event.wait()
+            # Wait until no new change has arrived for a full debounce interval
+            while True:
+                self.changed_event.clear()
+                try:
+                    await asyncio.wait_for(self.changed_event.wait(), self.debounce)
+                except asyncio.TimeoutError:
+                    break
+            
+            if ingest_jobs.active_job():
+                # A full reload is running; retry once it has had time to finish
+                self.changed_event.set()
+                await asyncio.sleep(self.debounce)
+                continue
+            
+            changed, self.changed = self.changed, set()
+            try:
+                report = await self.service.reingest_files(list(changed))
+                print(
+                    f"Re-ingested {len(changed)} changed files: added {report.added}, "
+                    f"updated {report.updated}, removed {report.removed}"
+                )
+            except Exception as e:
+                print(f"Error re-ingesting changed parts: {str(e)}")
@@ -0,0 +1,186 @@
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+from models.project import (
+    AddPartOp, AddWireOp, MovePartOp, PartInstance, ProjectOp, RemovePartOp, RemoveWireOp, SetPropertyOp
+)
+
+# Marks a property removed by set_property with a None value
+REMOVED = object()
+
+class ProjectOpUpdate:
+    """Net effect of a batch of operations, written as one pipeline update.
+
+    Operations are folded in order: edits to instances added in the same
+    batch are applied to them directly, and only the final state of each
+    stored instance is sent. The whole batch then lands in a single update,
+    so it is applied completely or not at all.
+    """
+
+    def __init__(self):
+        self.removed_parts: Set[str] = set()
+        self.added_parts: Dict[str, Dict[str, Any]] = {}
+        self.edits: Dict[str, Dict[str, Any]] = {}  # stored instance ID -> changed fields
+        self.removed_wires: Set[str] = set()
+        self.added_wires: Dict[str, Dict[str, Any]] = {}
+
+    def add_part(self, part: Dict[str, Any]):
+        self.added_parts.pop(part["id"], None)
+        self.added_parts[part["id"]] = part
+
+    def remove_part(self, part_id: str):
+        if self.added_parts.pop(part_id, None) is None:
+            self.removed_parts.add(part_id)
+            self.edits.pop(part_id, None)
+
+    def add_wire(self, wire: Dict[str, Any]):
+        self.added_wires.pop(wire["id"], None)
+        self.added_wires[wire["id"]] = wire
+
+    def remove_wire(self, wire_id: str):
+        if self.added_wires.pop(wire_id, None) is None:
+            self.removed_wires.add(wire_id)
+
+    def move_part(self, part_id: str, position: Dict[str, float], rotation: Any):
+        target = self.added_parts.get(part_id)
+        if target is None:
+            target = self.edits.setdefault(part_id, {})
+        target["position"] = position
+        if rotation is not None:
+            target["rotation"] = rotation
+
+    def set_property(self, part_id: str, key: str, value: Any):
+        part = self.added_parts.get(part_id)
+        if part is not None:
+            if value is None:
+                part["properties"].pop(key, None)
+            else:
+                part["properties"][key] = value
+            return
+        properties = self.edits.setdefault(part_id, {}).setdefault("properties", {})
+        properties[key] = REMOVED if value is None else value
+
+    @staticmethod
+    def _edited_part(edit: Dict[str, Any]) -> Dict[str, Any]:
+        """Expression rebuilding a stored instance ($$part) with its changed fields"""
+        part = {name: f"$$part.{name}" for name in PartInstance.model_fields}
+        for name in ("position", "rotation"):
+            if name in edit:
+                part[name] = {"$literal": edit[name]}
+        changes = edit.get("properties")
+        if changes:
+            kept = {
+                "$filter": {
+                    "input": {"$objectToArray": {"$ifNull": ["$$part.properties", {}]}},
+                    "as": "property",
+                    "cond": {"$not": {"$in": ["$$property.k", list(changes)]}}
+                }
+            }
+            added = [{"k": key, "v": value} for key, value in changes.items() if value is not REMOVED]
+            part["properties"] = {"$arrayToObject": {"$concatArrays": [kept, {"$literal": added}]}}
+        return part
+
+    def _array(self, name: str, removed: Set[str], added: Dict[str, Dict[str, Any]]) -> Any:
+        items: Any = f"${name}"
+        if removed:
+            items = {
+                "$filter": {
+                    "input": {"$ifNull": [items, []]},
+                    "as": "item",
+                    "cond": {"$not": {"$in": ["$$item.id", sorted(removed)]}}
+                }
+            }
+        if name == "parts" and self.edits:
+            items = {
+                "$map": {
+                    "input": {"$ifNull": [items, []]},
+                    "as": "part",
+                    "in": {
+                        "$switch": {
+                            "branches": [
+                                {"case": {"$eq": ["$$part.id", part_id]}, "then": self._edited_part(edit)}
+                                for part_id, edit in self.edits.items()
+                            ],
+                            "default": "$$part"
+                        }
+                    }
+                }
+            }
+        if added:
+            items = {"$concatArrays": [{"$ifNull": [items, []]}, {"$literal": list(added.values())}]}
+        return items
+
+    def to_pipeline(self, updated_at: datetime) -> List[Dict[str, Any]]:
+        """Pipeline update applying the batch, bumping the revision once"""
+        changes: Dict[str, Any] = {
+            "revision": {"$add": [{"$ifNull": ["$revision", 0]}, 1]},
+            "updated_at": {"$literal": updated_at}
+        }
+        if self.removed_parts or self.added_parts or self.edits:
+            changes["parts"] = self._array("parts", self.removed_parts, self.added_parts)
+        if self.removed_wires or self.added_wires:
+            changes["wires"] = self._array("wires", self.removed_wires, self.added_wires)
+        return [
+            {"$set": changes},
+            # Keep the counts the project list shows in step
+            {"$set": {
+                "part_count": {"$size": {"$ifNull": ["$parts", []]}},
+                "wire_count": {"$size": {"$ifNull": ["$wires", []]}}
+            }},
+            # Parts and wires no longer match their hashes from the last full save
+            {"$project": {"content_hashes.parts": 0, "content_hashes.wires": 0}}
+        ]
+
+def _check_property_key(key: str):
+    if not key or "." in key or key.startswith("$"):
+        raise ValueError(f"Invalid property name '{key}'")
+
+def build_project_update(
+    ops: List[ProjectOp],
+    part_ids: Set[str],
+    wires: Dict[str, Tuple[str, str]]
+) -> ProjectOpUpdate:
+    """Fold operations into the single update that applies them all.
+
+    part_ids and wires (wire ID -> (from part, to part)) describe the
+    project as stored; operations are checked against them in order, so
+    an invalid batch is rejected before anything is written.
+    """
+    part_ids = set(part_ids)
+    wires = dict(wires)
+    update = ProjectOpUpdate()
+
+    for index, op in enumerate(ops):
+        if isinstance(op, AddPartOp):
+            if op.part.id in part_ids:
+                raise ValueError(f"Operation {index}: part instance {op.part.id} already exists")
+            update.add_part(op.part.dict())
+            part_ids.add(op.part.id)
+        elif isinstance(op, AddWireOp):
+            wire = op.wire
+            if wire.id in wires:
+                raise ValueError(f"Operation {index}: wire {wire.id} already exists")
+            for part_id in (wire.from_part_id, wire.to_part_id):
+                if part_id not in part_ids:
+                    raise ValueError(f"Operation {index}: unknown part instance {part_id}")
+            update.add_wire(wire.dict())
+            wires[wire.id] = (wire.from_part_id, wire.to_part_id)
+        elif isinstance(op, RemoveWireOp):
+            if op.wire_id not in wires:
+                raise ValueError(f"Operation {index}: unknown wire {op.wire_id}")
+            update.remove_wire(op.wire_id)
+            del wires[op.wire_id]
+        else:
+            if op.part_id not in part_ids:
+                raise ValueError(f"Operation {index}: unknown part instance {op.part_id}")
+            if isinstance(op, RemovePartOp):
+                for wire_id in [wire_id for wire_id, ends in wires.items() if op.part_id in ends]:
+                    update.remove_wire(wire_id)
+                    del wires[wire_id]
+                update.remove_part(op.part_id)
+                part_ids.discard(op.part_id)
+            elif isinstance(op, MovePartOp):
+                update.move_part(op.part_id, op.position.dict(), op.rotation)
+            elif isinstance(op, SetPropertyOp):
+                _check_property_key(op.key)
+                update.set_property(op.part_id, op.key, op.value)
+    return update
@@ -1,21 +1,127 @@
-from typing import List, Optional
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
+import orjson
 from motor.motor_asyncio import AsyncIOMotorCollection
-from models.project import Project, ProjectCreate, ProjectUpdate
+from pymongo import ReturnDocument
+from models.project import Project, ProjectCreate, ProjectUpdate, ProjectOp, ProjectOpsResult, ProjectSummary
+from services.project_ops import build_project_update
+from services.pagination import decode_cursor, encode_cursor, keyset_filter, sort_key, InvalidCursor
+
+def _field_defaults(model) -> Dict[str, Any]:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory in (None, list, dict)
+    }
+
+# Values for fields missing from documents written before the fields existed
+PROJECT_DEFAULTS = _field_defaults(Project)
+PROJECT_SUMMARY_DEFAULTS = _field_defaults(ProjectSummary)
+
+# Most recently edited first; keyset cursors seek on these fields
+PROJECT_SORT = [("updated_at", -1), ("id", -1)]
+
+# Fields a save can change; each is stored with a hash to spot saves that change nothing
+PROJECT_CONTENT_FIELDS = ("name", "description", "parts", "wires", "canvas_settings", "thumbnail")
+
+# Stored project documents without bookkeeping fields
+PROJECT_DOCUMENT_PROJECTION = {"_id": 0, "content_hashes": 0, "part_count": 0, "wire_count": 0}
+
+# Just what the project list shows; the counts are kept up to date by every write
+PROJECT_SUMMARY_PROJECTION = {field: 1 for field in ProjectSummary.model_fields} | {"_id": 0}
+
+def count_fields(content: Dict[str, Any]) -> Dict[str, int]:
+    """Part and wire counts of the parts and wires present in a project or update"""
+    counts = {}
+    if "parts" in content:
+        counts["part_count"] = len(content["parts"])
+    if "wires" in content:
+        counts["wire_count"] = len(content["wires"])
+    return counts
+
+class RevisionConflict(Exception):
+    """Raised when a conditional write targets a revision that is no longer current.
+
+    Raised only before anything is written: the write it refers to was
+    not applied at all.
+    """
+
+    def __init__(self, revision: int):
+        super().__init__(f"Project has changed (current revision {revision})")
+        self.revision = revision
+
+def content_hashes(content: Dict[str, Any]) -> Dict[str, str]:
+    """Hash of each content field present in a project or update"""
+    return {
+        name: hashlib.sha1(orjson.dumps(content[name], option=orjson.OPT_SORT_KEYS)).hexdigest()
+        for name in PROJECT_CONTENT_FIELDS if name in content
+    }
 
 class ProjectService:
     def __init__(self, db_collection: AsyncIOMotorCollection):
         self.collection = db_collection
 
-    async def get_all_projects(self, skip: int = 0, limit: int = 100) -> List[Project]:
-        """Get all projects"""
-        cursor = self.collection.find({}).skip(skip).limit(limit).sort("updated_at", -1)
-        projects = await cursor.to_list(length=limit)
-        return [Project(**project) for project in projects]
+    async def get_all_projects(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        view: str = "full",
+        trusted: bool = False
+    ) -> Tuple[List[Union[Project, ProjectSummary, Dict[str, Any]]], Optional[str]]:
+        """Get a page of projects, and the cursor of the next page.
+
+        view="summary" reads only the fields the project list shows, not
+        parts and wires. Trusted callers get the stored documents, skipping
+        model validation.
+        """
+        query = {}
+        if cursor:
+            after, offset = decode_cursor(cursor)
+            if after is None:
+                raise InvalidCursor("Page cursor does not match the sort order")
+            # Seek past the last project of the previous page instead of skipping
+            query = keyset_filter(PROJECT_SORT, after)
+            skip = 0
+        summary = view == "summary"
+        projection = PROJECT_SUMMARY_PROJECTION if summary else PROJECT_DOCUMENT_PROJECTION
+        results = self.collection.find(query, projection).sort(PROJECT_SORT).skip(skip).limit(limit)
+        projects = await results.to_list(length=limit)
+        next_cursor = encode_cursor(sort_key(projects[-1], PROJECT_SORT)) if len(projects) == limit else None
+        model, defaults = (ProjectSummary, PROJECT_SUMMARY_DEFAULTS) if summary else (Project, PROJECT_DEFAULTS)
+        if trusted:
+            return [{**defaults, **project} for project in projects], next_cursor
+        return [model(**project) for project in projects], next_cursor
+
+    async def ensure_indexes(self):
+        """Create the indexes project listing relies on"""
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index(PROJECT_SORT)
+
+    async def backfill_revisions(self) -> int:
+        """Start revision numbers for projects stored before they were tracked"""
+        result = await self.collection.update_many({"revision": {"$exists": False}}, {"$set": {"revision": 0}})
+        if result.modified_count:
+            print(f"Added revision numbers to {result.modified_count} projects")
+        return result.modified_count
+
+    async def backfill_counts(self) -> int:
+        """Count parts and wires of projects stored before the counts were kept"""
+        result = await self.collection.update_many(
+            {"part_count": {"$exists": False}},
+            [{"$set": {
+                "part_count": {"$size": {"$ifNull": ["$parts", []]}},
+                "wire_count": {"$size": {"$ifNull": ["$wires", []]}}
+            }}]
+        )
+        if result.modified_count:
+            print(f"Counted parts and wires of {result.modified_count} projects")
+        return result.modified_count
 
     async def get_project_by_id(self, project_id: str) -> Optional[Project]:
         """Get a specific project by ID"""
-        project = await self.collection.find_one({"id": project_id})
+        project = await self.collection.find_one({"id": project_id}, PROJECT_DOCUMENT_PROJECTION)
         if project:
             return Project(**project)
         return None
@@ -23,25 +129,106 @@ class ProjectService:
     async def create_project(self, project_data: ProjectCreate) -> Project:
         """Create a new project"""
         project = Project(**project_data.dict())
-        await self.collection.insert_one(project.dict())
+        document = project.dict()
+        await self.collection.insert_one({
+            **document,
+            **count_fields(document),
+            "content_hashes": content_hashes(document)
+        })
         return project
 
-    async def update_project(self, project_id: str, project_data: ProjectUpdate) -> Optional[Project]:
-        """Update an existing project"""
-        update_data = {k: v for k, v in project_data.dict().items() if v is not None}
-        if not update_data:
+    async def _current_revision(self, project_id: str) -> Optional[int]:
+        current = await self.collection.find_one({"id": project_id}, {"_id": 0, "revision": 1})
+        return current.get("revision", 0) if current else None
+
+    async def update_project(
+        self,
+        project_id: str,
+        project_data: ProjectUpdate,
+        expected_revision: Optional[int] = None
+    ) -> Optional[Project]:
+        """Update an existing project.
+
+        With an expected revision the write only happens if the project is
+        still at that revision; otherwise RevisionConflict is raised. A save
+        that changes nothing is not written at all.
+        """
+        if expected_revision is None:
+            expected_revision = project_data.expected_revision
+        update_data = {
+            k: v for k, v in project_data.dict(exclude={"expected_revision"}).items() if v is not None
+        }
+        current = await self.collection.find_one({"id": project_id}, {"_id": 0, "revision": 1, "content_hashes": 1})
+        if not current:
+            return None
+        revision = current.get("revision", 0)
+        if expected_revision is not None and expected_revision != revision:
+            raise RevisionConflict(revision)
+
+        hashes = content_hashes(update_data)
+        stored_hashes = current.get("content_hashes", {})
+        if all(stored_hashes.get(name) == value for name, value in hashes.items()):
             return await self.get_project_by_id(project_id)
-        
+
         update_data["updated_at"] = datetime.utcnow()
-        
-        result = await self.collection.update_one(
-            {"id": project_id},
-            {"$set": update_data}
+        update_data.update(count_fields(update_data))
+        update_data.update({f"content_hashes.{name}": value for name, value in hashes.items()})
+        query = {"id": project_id}
+        if expected_revision is not None:
+            query["revision"] = revision
+        project = await self.collection.find_one_and_update(
+            query,
+            {"$set": update_data, "$inc": {"revision": 1}},
+            projection=PROJECT_DOCUMENT_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count:
-            return await self.get_project_by_id(project_id)
-        return None
+        if project:
+            return Project(**project)
+        # Deleted, or written by someone else since we looked
+        revision = await self._current_revision(project_id)
+        if revision is None:
+            return None
+        raise RevisionConflict(revision)
+
+    async def apply_ops(
+        self,
+        project_id: str,
+        ops: List[ProjectOp],
+        expected_revision: Optional[int] = None
+    ) -> Optional[ProjectOpsResult]:
+        """Apply granular edits in one update instead of rewriting parts and wires.
+
+        The batch is validated against the project as read and written only
+        if the project is still at that revision, in a single atomic update
+        that bumps the revision once. RevisionConflict means nothing was
+        applied; it is only raised when the caller gave an expected revision.
+        """
+        while True:
+            # Only IDs are read, to validate the batch before anything is written
+            current = await self.collection.find_one(
+                {"id": project_id},
+                {"_id": 0, "revision": 1, "parts.id": 1, "wires.id": 1, "wires.from_part_id": 1, "wires.to_part_id": 1}
+            )
+            if not current:
+                return None
+            revision = current.get("revision", 0)
+            if expected_revision is not None and expected_revision != revision:
+                raise RevisionConflict(revision)
+            update = build_project_update(
+                ops,
+                {part["id"] for part in current.get("parts", [])},
+                {wire["id"]: (wire["from_part_id"], wire["to_part_id"]) for wire in current.get("wires", [])}
+            )
+
+            updated_at = datetime.utcnow()
+            result = await self.collection.update_one(
+                {"id": project_id, "revision": revision},
+                update.to_pipeline(updated_at)
+            )
+            if result.matched_count:
+                return ProjectOpsResult(id=project_id, applied=len(ops), revision=revision + 1, updated_at=updated_at)
+            # Deleted, or written by someone else since we looked; nothing was applied.
+            # Without an expected revision the batch is checked again against the new state.
 
     async def delete_project(self, project_id: str) -> bool:
         """Delete a project"""
@@ -60,7 +247,8 @@ class ProjectService:
             description=original.description,
             parts=original.parts,
             wires=original.wires,
-            canvas_settings=original.canvas_settings
+            canvas_settings=original.canvas_settings,
+            thumbnail=original.thumbnail
         )
         
         return await self.create_project(project_data)
\ No newline at end of file
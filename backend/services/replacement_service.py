@@ -0,0 +1,63 @@
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReplaceOne
+from models.part import PartReplacement
+
+def compress_chains(edges: Dict[str, str]) -> Dict[str, List[str]]:
+    """Follow replaced-by edges to their end, returning each obsolete module's full chain"""
+    chains: Dict[str, List[str]] = {}
+    for start in edges:
+        if start in chains:
+            continue
+        path = []
+        seen = set()
+        node = start
+        # Walk until we leave the graph, hit a resolved node or loop back
+        while node in edges and node not in chains and node not in seen:
+            seen.add(node)
+            path.append(node)
+            node = edges[node]
+        # On a cycle, node is on the current path and has no chain yet,
+        # so everything on it resolves to the node where the loop closes
+        tail = [node] + chains.get(node, [])
+        for index, module_id in enumerate(path):
+            chains[module_id] = path[index + 1:] + tail
+    return chains
+
+class ReplacementService:
+    """Persisted obsolete-to-replacement module graph with compressed chains"""
+
+    def __init__(self, db_collection: AsyncIOMotorCollection):
+        self.collection = db_collection
+
+    async def ensure_indexes(self):
+        """Create the replacement graph indexes"""
+        await self.collection.create_index("module_id", unique=True)
+
+    async def rebuild(self, edges: Dict[str, str]):
+        """Replace the stored graph with one built from module_id -> replaced_by edges"""
+        chains = compress_chains(edges)
+        if chains:
+            await self.collection.bulk_write([
+                ReplaceOne(
+                    {"module_id": module_id},
+                    {"module_id": module_id, "replaced_by": edges[module_id], "replacement": chain[-1], "chain": chain},
+                    upsert=True
+                )
+                for module_id, chain in chains.items()
+            ], ordered=False)
+        await self.collection.delete_many({"module_id": {"$nin": list(chains)}})
+
+    async def resolve(self, module_id: str) -> PartReplacement:
+        """Resolve a module ID to its current replacement"""
+        entry = await self.collection.find_one({"module_id": module_id}, {"_id": 0})
+        if not entry:
+            return PartReplacement(module_id=module_id, replacement=module_id)
+        return PartReplacement(**entry)
+
+    async def resolve_many(self, module_ids: List[str]) -> Dict[str, str]:
+        """Resolve many module IDs with a single query"""
+        cursor = self.collection.find({"module_id": {"$in": module_ids}}, {"_id": 0, "module_id": 1, "replacement": 1})
+        entries = await cursor.to_list(length=None)
+        replacements = {entry["module_id"]: entry["replacement"] for entry in entries}
+        return {module_id: replacements.get(module_id, module_id) for module_id in module_ids}
@@ -0,0 +1,248 @@
+import bisect
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from services.facet_index import PartFacetIndex
+
+TOKEN_RE = re.compile(r"\w+")
+
+# How much a query word matching a token in each field contributes
+FIELD_WEIGHTS = {"title": 10.0, "tags": 5.0, "properties": 3.0, "connectors": 1.0}
+
+# Weaker matches count for less than an exact token match
+PREFIX_FACTOR = 0.7
+TYPO_FACTOR = 0.5
+
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+MAX_PREFIX_EXPANSIONS = 64
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercased word tokens"""
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+def _deletes(token: str) -> Set[str]:
+    """Every string one deletion away from the token"""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion, substitution or transposition"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) <= 1:
+            return True
+        return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+    if len(a) > len(b):
+        a, b = b, a
+    for i in range(len(b)):
+        if b[:i] + b[i + 1:] == a:
+            return True
+    return False
+
+class PartSearchIndex:
+    """In-memory inverted index over the parts catalog.
+
+    Postings map each token to the parts containing it, weighted by the
+    field it occurs in. Prefix matches come from a sorted token list and
+    typos (one edit) from a deletion neighbourhood, so lookups never scan
+    the catalog.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.part_tokens: Dict[str, Dict[str, float]] = {}
+        self.titles: Dict[str, str] = {}
+        self.sources: Dict[str, str] = {}
+        self.families: Dict[str, str] = {}
+        self.sorted_tokens: List[str] = []
+        self.deletes: Dict[str, Set[str]] = defaultdict(set)
+        self.facets = PartFacetIndex()
+
+    @staticmethod
+    def _weighted_tokens(part: Dict[str, Any]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        fields = {
+            "title": tokenize(part.get("title")),
+            "tags": [token for tag in part.get("tags") or [] for token in tokenize(tag)],
+            "properties": [
+                token for name, value in (part.get("properties") or {}).items()
+                for token in tokenize(f"{name} {value}")
+            ],
+            "connectors": [
+                token for connector in part.get("connectors") or []
+                for token in tokenize(connector.get("name"))
+            ]
+        }
+        for field, tokens in fields.items():
+            for token in tokens:
+                weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+        return weights
+
+    def _add_token(self, token: str):
+        bisect.insort(self.sorted_tokens, token)
+        if len(token) >= MIN_TYPO_LENGTH:
+            for variant in _deletes(token):
+                self.deletes[variant].add(token)
+
+    def _drop_token(self, token: str):
+        index = bisect.bisect_left(self.sorted_tokens, token)
+        if index < len(self.sorted_tokens) and self.sorted_tokens[index] == token:
+            del self.sorted_tokens[index]
+        if len(token) >= MIN_TYPO_LENGTH:
+            for variant in _deletes(token):
+                self.deletes[variant].discard(token)
+                if not self.deletes[variant]:
+                    del self.deletes[variant]
+
+    def add(self, part: Dict[str, Any]):
+        """Index a part, replacing any earlier version of it"""
+        part_id = part["id"]
+        self.remove(part_id)
+        tokens = self._weighted_tokens(part)
+        for token, weight in tokens.items():
+            if token not in self.postings:
+                self._add_token(token)
+            self.postings[token][part_id] = weight
+        self.part_tokens[part_id] = tokens
+        self.titles[part_id] = (part.get("title") or "").lower()
+        self.sources[part_id] = part.get("source") or ""
+        self.families[part_id] = ((part.get("properties") or {}).get("family") or "").lower()
+        self.facets.add(part_id, part.get("properties"), obsolete=self.sources[part_id] == "obsolete")
+
+    def remove(self, part_id: str):
+        """Drop a part from the index"""
+        self.facets.remove(part_id)
+        tokens = self.part_tokens.pop(part_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(part_id, None)
+            if not postings:
+                del self.postings[token]
+                self._drop_token(token)
+        self.titles.pop(part_id, None)
+        self.sources.pop(part_id, None)
+        self.families.pop(part_id, None)
+
+    @classmethod
+    def build(cls, parts: Iterable[Dict[str, Any]]) -> "PartSearchIndex":
+        """Build a new index from catalog documents"""
+        index = cls()
+        for part in parts:
+            index.add(part)
+        index.ready = True
+        return index
+
+    def replace_with(self, other: "PartSearchIndex"):
+        """Swap in the contents of a freshly built index"""
+        self.__dict__.update(other.__dict__)
+
+    def _matches(self, word: str) -> Dict[str, float]:
+        """Score every part matching one query word exactly, by prefix or with a typo"""
+        candidates = {word: 1.0}
+        if len(word) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self.sorted_tokens, word)
+            for token in self.sorted_tokens[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not token.startswith(word):
+                    break
+                candidates.setdefault(token, PREFIX_FACTOR)
+        if len(word) >= MIN_TYPO_LENGTH:
+            for variant in _deletes(word):
+                # The word has one extra character
+                if variant in self.postings:
+                    candidates.setdefault(variant, TYPO_FACTOR)
+                # One substituted or transposed character
+                for token in self.deletes.get(variant, ()):
+                    if token not in candidates and _within_one_edit(word, token):
+                        candidates[token] = TYPO_FACTOR
+            # The word is missing one character
+            for token in self.deletes.get(word, ()):
+                candidates.setdefault(token, TYPO_FACTOR)
+        
+        scores: Dict[str, float] = {}
+        for token, factor in candidates.items():
+            for part_id, weight in self.postings.get(token, {}).items():
+                scores[part_id] = max(scores.get(part_id, 0.0), weight * factor)
+        return scores
+
+    def _scores(self, words: List[str]) -> Dict[str, float]:
+        """Score parts matching every query word"""
+        scores: Optional[Dict[str, float]] = None
+        for word in dict.fromkeys(words):
+            matches = self._matches(word)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {part_id: score + matches[part_id] for part_id, score in scores.items() if part_id in matches}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def search(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 100,
+        family: Optional[str] = None,
+        include_obsolete: bool = False
+    ) -> List[str]:
+        """Return IDs of parts matching every query word, best matches first"""
+        words = tokenize(query)
+        if not words:
+            return []
+        scores = self._scores(words)
+        
+        family = family.lower() if family and family != "all" else None
+        results = [
+            part_id for part_id in scores
+            if (include_obsolete or self.sources.get(part_id) != "obsolete")
+            and (family is None or family in self.families.get(part_id, ""))
+        ]
+        results.sort(key=lambda part_id: (-scores[part_id], self.titles.get(part_id, "")))
+        return results[skip:skip + limit]
+
+    def faceted_search(
+        self,
+        query: Optional[str],
+        selections: Dict[str, List[str]],
+        facet_keys: Iterable[str],
+        skip: int = 0,
+        limit: int = 100,
+        include_obsolete: bool = False
+    ) -> Tuple[List[str], int, Dict[str, Dict[str, int]]]:
+        """Search with exact property selections.
+
+        Returns a page of matching IDs, the number of matches, and value
+        counts for each facet key over the matches.
+        """
+        words = tokenize(query)
+        scores = self._scores(words) if words else None
+        candidates = scores if scores is not None else self.part_tokens
+        results = [
+            part_id for part_id in candidates
+            if (include_obsolete or self.sources.get(part_id) != "obsolete")
+            and self.facets.matches(part_id, selections)
+        ]
+        if scores is not None:
+            results.sort(key=lambda part_id: (-scores[part_id], self.titles.get(part_id, "")))
+        else:
+            results.sort(key=lambda part_id: (self.titles.get(part_id, ""), part_id))
+        facets = self.facets.facet_counts(
+            facet_keys,
+            part_ids=scores,
+            selections=selections,
+            include_obsolete=include_obsolete
+        )
+        return results[skip:skip + limit], len(results), facets
+
+# Shared by every request; rebuilt from the catalog at startup and after ingestion
+part_search_index = PartSearchIndex()
@@ -0,0 +1,93 @@
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (min x, min y, max x, max y) in canvas units
+Box = Tuple[float, float, float, float]
+
+GRID_CELL_SIZE = float(os.environ.get('VIEWPORT_GRID_CELL_SIZE', 256))
+
+# Items covering more cells than this are checked on every query instead
+MAX_ITEM_CELLS = 1024
+
+def parse_bbox(text: str) -> Box:
+    """Parse "min_x,min_y,max_x,max_y" into a box"""
+    try:
+        min_x, min_y, max_x, max_y = (float(value) for value in text.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid bbox '{text}', expected min_x,min_y,max_x,max_y")
+    if not all(math.isfinite(value) for value in (min_x, min_y, max_x, max_y)) or min_x > max_x or min_y > max_y:
+        raise ValueError(f"Invalid bbox '{text}', expected min_x,min_y,max_x,max_y")
+    return min_x, min_y, max_x, max_y
+
+def intersects(a: Box, b: Box) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def bounding_box(points: Iterable[Tuple[float, float]], pad_x: float = 0.0, pad_y: float = 0.0) -> Box:
+    xs, ys = zip(*points)
+    return min(xs) - pad_x, min(ys) - pad_y, max(xs) + pad_x, max(ys) + pad_y
+
+def union_boxes(boxes: Iterable[Box]) -> Optional[Box]:
+    boxes = list(boxes)
+    if not boxes:
+        return None
+    return (
+        min(box[0] for box in boxes), min(box[1] for box in boxes),
+        max(box[2] for box in boxes), max(box[3] for box in boxes)
+    )
+
+def rotated_box(x: float, y: float, width: float, height: float, rotation: float) -> Box:
+    """Box around a width x height rectangle placed at (x, y) and rotated about that corner"""
+    if not rotation % 360:
+        return x, y, x + width, y + height
+    angle = math.radians(rotation)
+    cos, sin = math.cos(angle), math.sin(angle)
+    corners = [(0.0, 0.0), (width, 0.0), (0.0, height), (width, height)]
+    return bounding_box((x + cx * cos - cy * sin, y + cx * sin + cy * cos) for cx, cy in corners)
+
+class GridIndex:
+    """Uniform grid over bounding boxes.
+
+    Each item is listed in every cell its box overlaps, so a query only
+    looks at the cells under the viewport. Results keep insertion order,
+    which is the order the editor draws items in.
+    """
+
+    def __init__(self, cell_size: float = GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.boxes: List[Box] = []
+        self.oversized: List[int] = []
+
+    def _cell_range(self, box: Box) -> Tuple[int, int, int, int]:
+        size = self.cell_size
+        return (
+            math.floor(box[0] / size), math.floor(box[1] / size),
+            math.floor(box[2] / size), math.floor(box[3] / size)
+        )
+
+    def insert(self, box: Box) -> int:
+        """Add an item, returning its position"""
+        key = len(self.boxes)
+        self.boxes.append(box)
+        min_i, min_j, max_i, max_j = self._cell_range(box)
+        if (max_i - min_i + 1) * (max_j - min_j + 1) > MAX_ITEM_CELLS:
+            self.oversized.append(key)
+            return key
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                self.cells.setdefault((i, j), []).append(key)
+        return key
+
+    def query(self, box: Box) -> List[int]:
+        """Positions of the items whose boxes intersect the given box, in insertion order"""
+        min_i, min_j, max_i, max_j = self._cell_range(box)
+        if (max_i - min_i + 1) * (max_j - min_j + 1) > len(self.cells):
+            # Zoomed out past the grid: scanning every box is cheaper than every cell
+            return [key for key, item in enumerate(self.boxes) if intersects(item, box)]
+        found = set()
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                found.update(self.cells.get((i, j), ()))
+        found.update(self.oversized)
+        return sorted(key for key in found if intersects(self.boxes[key], box))
@@ -0,0 +1,258 @@
+import math
+import re
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Geometry is expressed in CSS pixels from the image's top-left corner: the
+# space the editor draws the part in, with the SVG at its physical size.
+
+Matrix = Tuple[float, float, float, float, float, float]
+Box = Tuple[float, float, float, float]  # min x, min y, max x, max y
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# CSS pixels per unit of an SVG width/height
+LENGTH_UNITS = {'': 1.0, 'px': 1.0, 'in': 96.0, 'mm': 96.0 / 25.4, 'cm': 96.0 / 2.54, 'pt': 96.0 / 72.0, 'pc': 16.0}
+LENGTH_RE = re.compile(r'\s*([-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?)\s*([a-z]*)\s*$', re.IGNORECASE)
+
+NUMBER_RE = re.compile(r'[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?')
+TRANSFORM_RE = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+PATH_TOKEN_RE = re.compile(r'[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?')
+PATH_ARGS = {'m': 2, 'l': 2, 'h': 1, 'v': 1, 'c': 6, 's': 4, 'q': 4, 't': 2, 'a': 7, 'z': 0}
+
+# Containers whose extent is the union of their children
+CONTAINER_TAGS = {'g', 'svg', 'a', 'switch'}
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def _number(value: Optional[str], default: float = 0.0) -> float:
+    if not value:
+        return default
+    match = NUMBER_RE.match(value.strip())
+    return float(match.group()) if match else default
+
+def _length(value: Optional[str]) -> Optional[float]:
+    """A width/height attribute in CSS pixels; None if absent, relative or unknown"""
+    match = LENGTH_RE.match(value or '')
+    if not match:
+        return None
+    scale = LENGTH_UNITS.get(match.group(2).lower())
+    length = float(match.group(1)) * scale if scale is not None else 0.0
+    return length if length > 0 else None
+
+def multiply(m1: Matrix, m2: Matrix) -> Matrix:
+    """Compose two affine matrices (m2 applied first)"""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1
+    )
+
+def parse_transform(value: Optional[str]) -> Matrix:
+    """Parse an SVG transform attribute into an affine matrix"""
+    matrix = IDENTITY
+    if not value:
+        return matrix
+    for name, args in TRANSFORM_RE.findall(value):
+        n = [float(x) for x in NUMBER_RE.findall(args)]
+        if name == 'matrix' and len(n) == 6:
+            step = tuple(n)
+        elif name == 'translate' and n:
+            step = (1.0, 0.0, 0.0, 1.0, n[0], n[1] if len(n) > 1 else 0.0)
+        elif name == 'scale' and n:
+            step = (n[0], 0.0, 0.0, n[1] if len(n) > 1 else n[0], 0.0, 0.0)
+        elif name == 'rotate' and n:
+            angle = math.radians(n[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(n) == 3:
+                cx, cy = n[1], n[2]
+                step = multiply(multiply((1.0, 0.0, 0.0, 1.0, cx, cy), step), (1.0, 0.0, 0.0, 1.0, -cx, -cy))
+        elif name == 'skewX' and n:
+            step = (1.0, 0.0, math.tan(math.radians(n[0])), 1.0, 0.0, 0.0)
+        elif name == 'skewY' and n:
+            step = (1.0, math.tan(math.radians(n[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        matrix = multiply(matrix, step)
+    return matrix
+
+def _path_points(d: str) -> List[Tuple[float, float]]:
+    """Endpoints and control points of a path; their hull contains the path"""
+    points = []
+    tokens = PATH_TOKEN_RE.findall(d)
+    x = y = start_x = start_y = 0.0
+    command = None
+    i = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in 'Zz':
+                x, y = start_x, start_y
+                continue
+        if command is None:
+            break
+        count = PATH_ARGS[command.lower()]
+        args = tokens[i:i + count]
+        if len(args) < count or any(arg.isalpha() for arg in args):
+            break
+        n = [float(arg) for arg in args]
+        i += count
+        relative = command.islower()
+        ox, oy = (x, y) if relative else (0.0, 0.0)
+        lower = command.lower()
+        if lower == 'h':
+            x = n[0] + (x if relative else 0.0)
+        elif lower == 'v':
+            y = n[0] + (y if relative else 0.0)
+        elif lower == 'a':
+            end_x, end_y = n[5] + ox, n[6] + oy
+            # Bound the arc by its radii around the chord midpoint
+            mid_x, mid_y = (x + end_x) / 2, (y + end_y) / 2
+            radius = max(abs(n[0]), abs(n[1]))
+            points.extend([(mid_x - radius, mid_y - radius), (mid_x + radius, mid_y + radius)])
+            x, y = end_x, end_y
+        else:
+            for j in range(0, count - 2, 2):
+                points.append((n[j] + ox, n[j + 1] + oy))
+            x, y = n[count - 2] + ox, n[count - 1] + oy
+        if lower == 'm':
+            start_x, start_y = x, y
+            # Further coordinate pairs after a moveto are implicit linetos
+            command = 'l' if relative else 'L'
+        points.append((x, y))
+    return points
+
+def _local_points(element: ET.Element) -> List[Tuple[float, float]]:
+    tag = _local_name(element.tag)
+    get = element.get
+    if tag == 'rect':
+        x, y = _number(get('x')), _number(get('y'))
+        return [(x, y), (x + _number(get('width')), y + _number(get('height')))]
+    if tag == 'circle':
+        cx, cy, r = _number(get('cx')), _number(get('cy')), _number(get('r'))
+        return [(cx - r, cy - r), (cx + r, cy + r)]
+    if tag == 'ellipse':
+        cx, cy = _number(get('cx')), _number(get('cy'))
+        rx, ry = _number(get('rx')), _number(get('ry'))
+        return [(cx - rx, cy - ry), (cx + rx, cy + ry)]
+    if tag == 'line':
+        return [(_number(get('x1')), _number(get('y1'))), (_number(get('x2')), _number(get('y2')))]
+    if tag in ('polyline', 'polygon'):
+        n = [float(x) for x in NUMBER_RE.findall(get('points', ''))]
+        return list(zip(n[0::2], n[1::2]))
+    if tag == 'path':
+        return _path_points(get('d', ''))
+    return []
+
+def _union(box: Optional[Box], other: Optional[Box]) -> Optional[Box]:
+    if box is None:
+        return other
+    if other is None:
+        return box
+    return (min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3]))
+
+def _element_box(element: ET.Element, matrix: Matrix) -> Optional[Box]:
+    """Bounding box of an element in the space the matrix maps into"""
+    matrix = multiply(matrix, parse_transform(element.get('transform')))
+    if _local_name(element.tag) in CONTAINER_TAGS:
+        box = None
+        for child in element:
+            box = _union(box, _element_box(child, matrix))
+        return box
+    
+    a, b, c, d, e, f = matrix
+    points = _local_points(element)
+    # Transform all four corners so rotations still yield a covering box
+    if _local_name(element.tag) in ('rect', 'circle', 'ellipse') and len(points) == 2:
+        (x1, y1), (x2, y2) = points
+        points = [(x1, y1), (x2, y1), (x1, y2), (x2, y2)]
+    if not points:
+        return None
+    xs = [a * x + c * y + e for x, y in points]
+    ys = [b * x + d * y + f for x, y in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+class SvgDocument:
+    """An SVG file indexed by element ID for connector lookups"""
+
+    def __init__(self, root: ET.Element):
+        self.root = root
+        self.width, self.height, self.matrix = self._viewport(root)
+        self.elements: Dict[str, ET.Element] = {}
+        self.parents: Dict[ET.Element, ET.Element] = {}
+        for parent in root.iter():
+            element_id = parent.get('id')
+            if element_id and element_id not in self.elements:
+                self.elements[element_id] = parent
+            for child in parent:
+                self.parents[child] = parent
+
+    @staticmethod
+    def _viewport(root: ET.Element) -> Tuple[float, float, Matrix]:
+        """Rendered size in pixels and the matrix from root user space into it"""
+        width, height = _length(root.get('width')), _length(root.get('height'))
+        view_box = [float(x) for x in NUMBER_RE.findall(root.get('viewBox', ''))]
+        if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+            return width or 0.0, height or 0.0, IDENTITY
+        min_x, min_y, box_width, box_height = view_box
+        # A missing dimension follows the viewBox's aspect ratio
+        if width is None and height is None:
+            width, height = box_width, box_height
+        elif width is None:
+            width = height * box_width / box_height
+        elif height is None:
+            height = width * box_height / box_width
+        # Default preserveAspectRatio: uniform scale, centered (xMidYMid meet)
+        scale = min(width / box_width, height / box_height)
+        offset_x = (width - box_width * scale) / 2 - min_x * scale
+        offset_y = (height - box_height * scale) / 2 - min_y * scale
+        return width, height, (scale, 0.0, 0.0, scale, offset_x, offset_y)
+
+    def element_box(self, element_id: Optional[str]) -> Optional[Box]:
+        """Bounding box of an element in pixels, with all transforms applied"""
+        element = self.elements.get(element_id) if element_id else None
+        if element is None:
+            return None
+        ancestors = []
+        parent = self.parents.get(element)
+        while parent is not None and parent is not self.root:
+            ancestors.append(parent)
+            parent = self.parents.get(parent)
+        matrix = self.matrix
+        for ancestor in reversed(ancestors):
+            matrix = multiply(matrix, parse_transform(ancestor.get('transform')))
+        return _element_box(element, matrix)
+
+@lru_cache(maxsize=256)
+def _load_svg_document(svg_path: str, mtime_ns: int) -> Optional[SvgDocument]:
+    try:
+        return SvgDocument(ET.parse(svg_path).getroot())
+    except (ET.ParseError, OSError) as e:
+        print(f"Error parsing SVG file {svg_path}: {str(e)}")
+        return None
+
+def load_svg_document(svg_path: Path) -> Optional[SvgDocument]:
+    """Load an SVG document, reusing it while the file is unchanged"""
+    try:
+        mtime_ns = svg_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _load_svg_document(str(svg_path), mtime_ns)
+
+def parse_svg_document(data: bytes) -> Optional[SvgDocument]:
+    """Parse an SVG held in memory, such as one read from an .fzpz archive"""
+    try:
+        return SvgDocument(ET.fromstring(data))
+    except ET.ParseError as e:
+        print(f"Error parsing SVG data: {str(e)}")
+        return None
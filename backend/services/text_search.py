@@ -0,0 +1,43 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Relative weights of the catalog text index: a title hit outranks a tag
+# hit, which outranks a description hit
+TEXT_INDEX_WEIGHTS = {"title": 10, "tags": 5, "description": 1}
+TEXT_INDEX_NAME = "part_text_search"
+
+WORD_RE = re.compile(r"\w+")
+PHRASE_RE = re.compile(r'"([^"]*)"')
+
+def search_terms(title: Optional[str], tags: Optional[List[str]]) -> List[str]:
+    """Lowercased words of a part's title and tags, indexed for prefix matching"""
+    words = set()
+    for text in [title or ""] + list(tags or []):
+        words.update(word.lower() for word in WORD_RE.findall(text))
+    return sorted(words)
+
+def build_search_query(search: str) -> Tuple[Dict[str, Any], bool]:
+    """Translate search box input into a Mongo query.
+
+    Quoted text is matched as a phrase and complete words go to the text
+    index. While the user is still typing the last word (no trailing
+    space), that word is matched as a prefix of an indexed search term.
+    Only word characters survive, so the input can't inject text-search
+    operators or regex syntax. Returns the query and whether it can be
+    ranked by text score.
+    """
+    phrases = [" ".join(WORD_RE.findall(phrase)) for phrase in PHRASE_RE.findall(search)]
+    phrases = [phrase for phrase in phrases if phrase]
+    words = [word.lower() for word in WORD_RE.findall(PHRASE_RE.sub(" ", search))]
+    
+    prefix = None
+    if words and WORD_RE.fullmatch(search[-1]):
+        prefix = words.pop()
+    
+    query: Dict[str, Any] = {}
+    text_terms = [f'"{phrase}"' for phrase in phrases] + words
+    if text_terms:
+        query["$text"] = {"$search": " ".join(text_terms)}
+    if prefix:
+        query["search_terms"] = {"$regex": f"^{re.escape(prefix)}"}
+    return query, bool(text_terms)
@@ -0,0 +1,106 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+SI_PREFIXES = {
+    "p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "μ": 1e-6, "m": 1e-3,
+    "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9
+}
+
+# Unit spellings, mapped to the base unit and the factor to convert into it
+UNITS = {
+    "ω": ("Ω", 1.0), "ohm": ("Ω", 1.0), "ohms": ("Ω", 1.0),
+    "f": ("F", 1.0), "h": ("H", 1.0), "v": ("V", 1.0), "vdc": ("V", 1.0),
+    "a": ("A", 1.0), "w": ("W", 1.0), "hz": ("Hz", 1.0),
+    "mm": ("m", 1e-3), "cm": ("m", 1e-2), "in": ("m", 0.0254), "mil": ("m", 2.54e-5)
+}
+
+# Base unit of well-known properties; values in another unit are ignored for them
+PROPERTY_UNITS = {
+    "resistance": "Ω",
+    "maximum resistance": "Ω",
+    "capacitance": "F",
+    "inductance": "H",
+    "voltage": "V",
+    "current": "A",
+    "power": "W",
+    "frequency": "Hz",
+    "pin spacing": "m",
+    "spacing": "m"
+}
+
+# A number, an optional SI prefix and an optional unit. Unit symbols ignore
+# case but prefixes don't: "m" is milli and "M" is mega. The metric lengths
+# carry a prefix of their own, so they match in lower case only ("1MM" is
+# not 1 mm), while "in" and "mil" are plain symbols. Trailing notes such as
+# "(2.54mm)" or "±1%" are allowed; ranges and lists ("3-17V", "3.3V / 5V")
+# are not.
+QUANTITY_RE = re.compile(
+    r"^\s*(?P<number>\d+(?:\.\d*)?|\.\d+)\s*"
+    r"(?P<unit>(?-i:mm|cm)|in|mil|(?P<prefix>(?-i:[pnuµμmkKMG]))?\s*(?P<base>Ω|ohms?|vdc|hz|[fhvaw])?)"
+    r"\s*(?:\(.*\)|±.*)?\s*$",
+    re.IGNORECASE
+)
+
+RANGE_RE = re.compile(r"^\s*(?P<name>[^<>=]+?)\s*(?P<op>>=|<=|>|<|=)\s*(?P<value>.+?)\s*$")
+RANGE_OPERATORS = {">=": "$gte", "<=": "$lte", ">": "$gt", "<": "$lt", "=": "$eq"}
+
+def _normalize(value: float) -> float:
+    # Keep equal quantities equal however they were written ("0.1µF", "100nF")
+    return float(f"{value:.12g}")
+
+def parse_quantity(text: Optional[str]) -> Optional[Tuple[float, Optional[str]]]:
+    """Parse text like "4.7kΩ" or "0.1in" into (value in base units, base unit)"""
+    match = QUANTITY_RE.match(text or "")
+    if not match:
+        return None
+    value = float(match.group("number"))
+    unit = match.group("unit")
+    if unit.lower() in UNITS:
+        base, factor = UNITS[unit.lower()]
+        return _normalize(value * factor), base
+    prefix = match.group("prefix")
+    if prefix:
+        value *= SI_PREFIXES[prefix]
+    base = match.group("base")
+    return _normalize(value), UNITS[base.lower()][0] if base else None
+
+def numeric_properties(properties: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Normalized numeric values of a part's properties, stored for range queries"""
+    values = []
+    for name, text in (properties or {}).items():
+        quantity = parse_quantity(text)
+        if quantity is None:
+            continue
+        name = name.strip().lower()
+        value, unit = quantity
+        expected = PROPERTY_UNITS.get(name)
+        if expected and unit and unit != expected:
+            continue
+        values.append({"name": name, "value": value})
+    return values
+
+def parse_range(expression: str) -> Tuple[str, str, float]:
+    """Parse a filter like "capacitance>=10nF" into (property, Mongo operator, value)"""
+    match = RANGE_RE.match(expression)
+    quantity = parse_quantity(match.group("value")) if match else None
+    if quantity is None:
+        raise ValueError(f"Invalid range '{expression}', expected e.g. capacitance>=10nF")
+    name = match.group("name").lower()
+    value, unit = quantity
+    expected = PROPERTY_UNITS.get(name)
+    if expected and unit and unit != expected:
+        raise ValueError(f"{name} is measured in {expected}, not {unit}")
+    return name, RANGE_OPERATORS[match.group("op")], value
+
+def build_range_query(expressions: List[str]) -> Dict[str, Any]:
+    """Mongo query matching parts whose numeric properties satisfy every range"""
+    conditions: Dict[str, Dict[str, float]] = {}
+    for expression in expressions:
+        name, operator, value = parse_range(expression)
+        conditions.setdefault(name, {})[operator] = value
+    return {
+        "$and": [
+            {"numeric_properties": {"$elemMatch": {"name": name, "value": condition}}}
+            for name, condition in conditions.items()
+        ]
+    } if conditions else {}
@@ -0,0 +1,131 @@
+import math
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from services.part_cache import ReadThroughCache
+from services.spatial_index import Box, GridIndex, bounding_box, rotated_box, union_boxes
+
+VIEWPORT_CACHE_SIZE = int(os.environ.get('VIEWPORT_CACHE_SIZE', 256))
+VIEWPORT_CACHE_TTL = float(os.environ.get('VIEWPORT_CACHE_TTL', 3600))
+
+# Size of the placeholder the editor draws for a part whose breadboard image
+# is missing or fails to load (PartRenderer's w-16 h-16 box)
+PLACEHOLDER_FOOTPRINT = (64.0, 64.0)
+
+# Wires are drawn as curves bowing out by up to this much, plus their end markers
+WIRE_MAX_BOW = 50.0
+WIRE_MARGIN = 6.0
+
+def wire_box(wire: Dict[str, Any], part_boxes: Dict[str, Box]) -> Optional[Box]:
+    """Box around a wire as the editor draws it, or around the parts it joins"""
+    start, end = wire.get("from_pos"), wire.get("to_pos")
+    if start and end:
+        bow = min(WIRE_MAX_BOW, math.dist((start["x"], start["y"]), (end["x"], end["y"])) * 0.2)
+        return bounding_box(
+            [(start["x"], start["y"]), (end["x"], end["y"])],
+            pad_x=bow + WIRE_MARGIN,
+            pad_y=WIRE_MARGIN
+        )
+    # Without stored positions, the wire is somewhere between its two parts
+    return union_boxes(
+        part_boxes[part_id] for part_id in (wire["from_part_id"], wire["to_part_id"]) if part_id in part_boxes
+    )
+
+class ViewportIndex:
+    """Grid indexes over one project's part instances and wires"""
+
+    def __init__(self):
+        self.revision: Optional[int] = None
+        self.parts: List[Dict[str, Any]] = []
+        self.wires: List[Dict[str, Any]] = []
+        self.part_grid = GridIndex()
+        self.wire_grid = GridIndex()
+        # Catalog part ID or module ID -> rendered breadboard (width, height) in pixels
+        self.footprints: Dict[str, Tuple[float, float]] = {}
+
+    def build(self, revision: int, parts: List[Dict[str, Any]], wires: List[Dict[str, Any]]):
+        """Index the project as stored at a revision"""
+        self.revision = revision
+        self.parts, self.wires = parts, []
+        self.part_grid, self.wire_grid = GridIndex(), GridIndex()
+        part_boxes = {}
+        for part in parts:
+            width, height = self.footprints.get(part["part_id"], PLACEHOLDER_FOOTPRINT)
+            position = part["position"]
+            box = rotated_box(position["x"], position["y"], width, height, part.get("rotation") or 0.0)
+            self.part_grid.insert(box)
+            part_boxes[part["id"]] = box
+        for wire in wires:
+            box = wire_box(wire, part_boxes)
+            if box is not None:
+                self.wires.append(wire)
+                self.wire_grid.insert(box)
+
+    def query(self, box: Box) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Part instances and wires that overlap a box"""
+        return (
+            [self.parts[key] for key in self.part_grid.query(box)],
+            [self.wires[key] for key in self.wire_grid.query(box)]
+        )
+
+# Viewport indexes by project ID, shared by every request in this process
+viewport_cache = ReadThroughCache(max_size=VIEWPORT_CACHE_SIZE, ttl=VIEWPORT_CACHE_TTL)
+
+class ViewportService:
+    def __init__(
+        self,
+        projects: AsyncIOMotorCollection,
+        parts: AsyncIOMotorCollection,
+        cache: ReadThroughCache = viewport_cache
+    ):
+        self.projects = projects
+        self.parts = parts
+        self.cache = cache
+
+    async def _load_footprints(self, part_ids: Set[str]) -> Dict[str, Tuple[float, float]]:
+        """Rendered breadboard size of the given catalog parts, by part ID or module ID.
+
+        The size is the breadboard SVG's physical size in pixels, recorded at
+        ingest; parts without one are drawn as the editor's placeholder.
+        """
+        keys = list(part_ids)
+        cursor = self.parts.find(
+            {"$or": [{"id": {"$in": keys}}, {"module_id": {"$in": keys}}]},
+            {"_id": 0, "id": 1, "module_id": 1, "views.breadboard": 1}
+        )
+        found = {part_id: PLACEHOLDER_FOOTPRINT for part_id in part_ids}
+        async for part in cursor:
+            view = part.get("views", {}).get("breadboard")
+            if not view or view["width"] <= 0 or view["height"] <= 0:
+                continue
+            for key in (part["id"], part.get("module_id")):
+                if key in found:
+                    found[key] = (view["width"], view["height"])
+        return found
+
+    async def get_viewport(self, project_id: str, box: Box) -> Optional[Dict[str, Any]]:
+        """Part instances and wires of a project that overlap a box"""
+        state = self.cache.get(project_id)
+        current = await self.projects.find_one({"id": project_id}, {"_id": 0, "revision": 1})
+        if not current:
+            self.cache.invalidate([project_id])
+            return None
+        revision = current.get("revision", 0)
+
+        if state is not None and state.revision == revision:
+            self.cache.record(hits=1)
+        else:
+            self.cache.record(misses=1)
+            project = await self.projects.find_one({"id": project_id}, {"_id": 0, "revision": 1, "parts": 1, "wires": 1})
+            if not project:
+                return None
+            state = state or ViewportIndex()
+            parts = project.get("parts", [])
+            unknown = {part["part_id"] for part in parts} - state.footprints.keys()
+            if unknown:
+                state.footprints.update(await self._load_footprints(unknown))
+            state.build(project.get("revision", 0), parts, project.get("wires", []))
+            self.cache.put(project_id, state)
+
+        parts, wires = state.query(box)
+        return {"project_id": project_id, "revision": state.revision, "parts": parts, "wires": wires}
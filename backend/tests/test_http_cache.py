@@ -0,0 +1,51 @@
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from compression import CompressionMiddleware
+from services.http_cache import conditional_get, decoded_etag, encoded_etag, etag_matches, if_match_revision
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+@app.get("/items")
+def items(request: Request, response: Response):
+    conditional_get(request, response, 3)
+    return ["x" * 20] * 20
+
+client = TestClient(app)
+
+def test_each_content_coding_gets_its_own_etag():
+    identity = client.get("/items", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == encoded_etag(identity.headers["etag"], "gzip")
+    assert gzipped.json() == identity.json()
+
+def test_revalidating_a_coded_copy():
+    etag = client.get("/items", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get("/items", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    # A client that stopped accepting gzip may still reuse its copy after decoding it
+    response = client.get("/items", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == decoded_etag(etag)
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('"3-abc"', True),
+    ('W/"3-abc-br"', True),
+    ('"2-abc", "3-abc-gzip"', True),
+    ('"3-abc-deflate"', False),
+    ('"3-ab"', False),
+    ("*", True),
+    (None, False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, '"3-abc"') is matches
+
+def test_if_match_accepts_coded_project_etags():
+    assert if_match_revision('"4-gzip"') == 4
+    assert if_match_revision("*") is None
+    with pytest.raises(ValueError):
+        if_match_revision('"4-abc"')
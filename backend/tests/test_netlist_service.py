@@ -0,0 +1,119 @@
+import asyncio
+import random
+from mongomock_motor import AsyncMongoMockClient
+from services.netlist_service import NetlistService, ProjectNetlist
+from services.part_cache import ReadThroughCache
+
+def nets_of(netlist):
+    return [([(node.part_id, node.connector) for node in net.nodes], net.wires) for net in netlist.nets]
+
+def naive_nets(instances, wires, bus_mates):
+    """Connected components by graph search, recomputed from scratch"""
+    links = {}
+    def link(a, b):
+        links.setdefault(a, set()).add(b)
+        links.setdefault(b, set()).add(a)
+    for a, b in wires.values():
+        link(a, b)
+    stack, seen = list(links), set()
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        for mate in bus_mates.get(instances.get(node[0]), {}).get(node[1], []):
+            link(node, (node[0], mate))
+            stack.append((node[0], mate))
+    nets, done = [], set()
+    for node in links:
+        if node in done:
+            continue
+        component, stack = set(), [node]
+        while stack:
+            current = stack.pop()
+            if current not in component:
+                component.add(current)
+                stack.extend(links[current])
+        done |= component
+        net_wires = sorted(wire_id for wire_id, (a, _) in wires.items() if a in component)
+        nets.append((sorted(component), net_wires))
+    return sorted(nets)
+
+def test_bus_joins_connectors_of_one_instance():
+    state = ProjectNetlist()
+    state.bus_mates = {"header": {"c0": ["c1"], "c1": ["c0"]}}
+    state.update(1, {"h": "header", "r": "resistor"}, {
+        "w1": (("r", "a"), ("h", "c0")),
+        "w2": (("h", "c1"), ("r", "b")),
+        "w3": (("r", "x"), ("r", "y"))
+    })
+    assert nets_of(state.to_netlist("p")) == [
+        ([("h", "c0"), ("h", "c1"), ("r", "a"), ("r", "b")], ["w1", "w2"]),
+        ([("r", "x"), ("r", "y")], ["w3"])
+    ]
+    # Dropping a wire splits the net it was in, and only that one
+    state.update(2, {"h": "header", "r": "resistor"}, {"w1": (("r", "a"), ("h", "c0")), "w3": (("r", "x"), ("r", "y"))})
+    assert nets_of(state.to_netlist("p")) == [
+        ([("h", "c0"), ("h", "c1"), ("r", "a")], ["w1"]),
+        ([("r", "x"), ("r", "y")], ["w3"])
+    ]
+
+def test_incremental_updates_match_recomputation():
+    rng = random.Random(3)
+    bus_mates = {}
+    for part in "ABC":
+        connectors = [f"c{i}" for i in range(6)]
+        rng.shuffle(connectors)
+        bus = connectors[:3]
+        bus_mates[part] = {c: [m for m in bus if m != c] for c in bus}
+    for _ in range(100):
+        state = ProjectNetlist()
+        state.bus_mates = bus_mates
+        instances, wires, next_wire = {}, {}, 0
+        for revision in range(20):
+            for _ in range(rng.randint(1, 4)):
+                roll = rng.random()
+                if roll < 0.15 or not instances:
+                    instances[f"i{rng.randint(0, 6)}"] = rng.choice("ABCD")
+                elif roll < 0.2:
+                    instances.pop(rng.choice(list(instances)))
+                elif roll < 0.65:
+                    next_wire += 1
+                    wires[f"w{next_wire}"] = tuple(
+                        (rng.choice(list(instances) + ["missing"]), f"c{rng.randint(0, 5)}") for _ in range(2)
+                    )
+                elif wires:
+                    wire_id = rng.choice(list(wires))
+                    if rng.random() < 0.2:
+                        wires[wire_id] = ((rng.choice(list(instances)), "c0"), wires[wire_id][1])
+                    else:
+                        del wires[wire_id]
+            state.update(revision, dict(instances), dict(wires))
+            assert nets_of(state.to_netlist("p")) == naive_nets(instances, wires, bus_mates)
+
+def test_netlist_service_follows_revisions():
+    async def run():
+        db = AsyncMongoMockClient().db
+        await db.fritzing_parts.insert_one({"id": "p1", "module_id": "HeaderModuleID", "buses": [{"id": "b", "connectors": ["c0", "c1"]}]})
+        wire = {"id": "w1", "from_part_id": "a", "from_connector": "c0", "to_part_id": "b", "to_connector": "c9"}
+        await db.projects.insert_one({
+            "id": "proj", "revision": 1,
+            "parts": [{"id": "a", "part_id": "HeaderModuleID"}, {"id": "b", "part_id": "other"}],
+            "wires": [wire]
+        })
+        cache = ReadThroughCache(max_size=8, ttl=60)
+        service = NetlistService(db.projects, db.fritzing_parts, cache=cache)
+
+        first = await service.get_netlist("proj")
+        assert nets_of(first) == [([("a", "c0"), ("a", "c1"), ("b", "c9")], ["w1"])]
+        assert (await service.get_netlist("proj")) is first
+        assert cache.stats().hits == 1
+
+        await db.projects.update_one({"id": "proj"}, {"$set": {"wires": [], "revision": 2}})
+        second = await service.get_netlist("proj")
+        assert second.revision == 2 and second.nets == []
+
+        await db.projects.delete_one({"id": "proj"})
+        assert await service.get_netlist("proj") is None
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from services.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_filter, sort_key
+
+def test_cursor_round_trip():
+    key = ["LED", datetime(2026, 1, 2, 3, 4, 5), 7, None]
+    assert decode_cursor(encode_cursor(key)) == (key, None)
+    assert decode_cursor(encode_cursor(offset=40)) == (None, 40)
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(offset=-1), "eyJvIjoiMSJ9", "W10"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+def test_keyset_filter():
+    sort = [("updated_at", -1), ("id", -1)]
+    assert keyset_filter(sort, ["t", "b"]) == {"$or": [
+        {"updated_at": {"$lt": "t"}},
+        {"updated_at": "t", "id": {"$lt": "b"}}
+    ]}
+    with pytest.raises(InvalidCursor):
+        keyset_filter(sort, ["t"])
+
+@pytest.mark.parametrize("sort", [[("title", 1), ("id", 1)], [("updated_at", -1), ("id", -1)]])
+def test_pages_cover_every_document_once(sort):
+    async def paginate():
+        collection = AsyncMongoMockClient().db.items
+        start = datetime(2026, 1, 1)
+        # Few distinct titles and times, so pages break inside runs of ties
+        await collection.insert_many([
+            {"id": f"{i:03}", "title": f"part {i % 4}", "updated_at": start + timedelta(minutes=i % 3)}
+            for i in range(50)
+        ])
+        seen, cursor = [], None
+        while True:
+            query = keyset_filter(sort, decode_cursor(cursor)[0]) if cursor else {}
+            page = await collection.find(query, {"_id": 0}).sort(sort).limit(7).to_list(length=None)
+            seen.extend(document["id"] for document in page)
+            if len(page) < 7:
+                break
+            cursor = encode_cursor(sort_key(page[-1], sort))
+        everything = await collection.find({}, {"_id": 0}).sort(sort).to_list(length=None)
+        return seen, [document["id"] for document in everything]
+
+    seen, expected = asyncio.run(paginate())
+    assert seen == expected
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from services.part_cache import ReadThroughCache
+
+class Loader:
+    """Counts calls and blocks each load until released"""
+
+    def __init__(self, value="part"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return self.value
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        cache = ReadThroughCache(max_size=8, ttl=60)
+        loader = Loader()
+        requests = [asyncio.create_task(cache.get_or_load("a", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        assert await asyncio.gather(*requests) == ["part"] * 5
+        assert loader.calls == 1
+        assert await cache.get_or_load("a", loader) == "part"
+        stats = cache.stats()
+        assert (stats.misses, stats.coalesced, stats.hits, stats.size) == (1, 4, 1, 1)
+
+    asyncio.run(run())
+
+def test_waiter_takes_over_a_cancelled_load():
+    async def run():
+        cache = ReadThroughCache(max_size=8, ttl=60)
+        first, second = Loader("first"), Loader("second")
+        loading = asyncio.create_task(cache.get_or_load("a", first))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(cache.get_or_load("a", second))
+        await asyncio.sleep(0)
+
+        second.release.set()
+        loading.cancel()
+        assert await waiting == "second"
+        assert loading.cancelled()
+        assert (first.calls, second.calls) == (1, 1)
+        assert cache.get("a") == "second"
+
+    asyncio.run(run())
+
+def test_cancelled_waiter_does_not_reload():
+    async def run():
+        cache = ReadThroughCache(max_size=8, ttl=60)
+        first, second = Loader(), Loader()
+        loading = asyncio.create_task(cache.get_or_load("a", first))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(cache.get_or_load("a", second))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        first.release.set()
+        assert await loading == "part"
+        assert second.calls == 0
+
+    asyncio.run(run())
+
+def test_load_started_before_invalidation_is_not_cached():
+    async def run():
+        cache = ReadThroughCache(max_size=8, ttl=60)
+        loader = Loader("old")
+        loading = asyncio.create_task(cache.get_or_load("a", loader))
+        await asyncio.sleep(0)
+        cache.invalidate(["a"])
+        loader.release.set()
+        assert await loading == "old"
+        assert cache.get("a") is None
+
+        loader.value = "new"
+        assert await cache.get_or_load("a", loader) == "new"
+        assert cache.get("a") == "new"
+
+    asyncio.run(run())
+
+def test_failed_load_is_not_cached():
+    async def run():
+        cache = ReadThroughCache(max_size=8, ttl=60)
+
+        async def fail():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("a", fail)
+        assert cache.pending == {}
+        assert cache.get("a") is None
+
+    asyncio.run(run())
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ReadThroughCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    cache.put("missing", None)
+    assert cache.stats().evictions == 1
+    assert cache.stats().size == 2
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("services.part_cache.time.monotonic", lambda: now[0])
+    cache = ReadThroughCache(max_size=8, ttl=10)
+    cache.put("a", 1)
+    now[0] += 10
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a") is None
+    assert (cache.stats().expirations, cache.stats().size) == (1, 0)
@@ -0,0 +1,84 @@
+import asyncio
+import shutil
+from pathlib import Path
+from mongomock_motor import AsyncMongoMockClient
+from services.part_cache import ReadThroughCache
+from services.part_service import PartService
+from services.search_index import PartSearchIndex
+
+PARTS_ROOT = Path(__file__).resolve().parents[2] / "public" / "parts"
+
+def part_service(tmp_path, count):
+    for fzp_file in sorted((PARTS_ROOT / "core").glob("*.fzp"))[:count]:
+        (tmp_path / "core").mkdir(exist_ok=True)
+        shutil.copy(fzp_file, tmp_path / "core")
+    service = PartService(AsyncMongoMockClient().db.fritzing_parts)
+    service.fritzing_parts_path = tmp_path
+    service.snapshot_path = None
+    service.search_index = PartSearchIndex()
+    service.cache = ReadThroughCache(max_size=8, ttl=60)
+    return service
+
+def test_cancelled_ingest_refreshes_what_it_wrote(tmp_path):
+    async def run():
+        service = part_service(tmp_path, 6)
+        write_batch = service._write_batch
+
+        async def write_then_cancel(*args):
+            result = await write_batch(*args)
+            load.cancel()
+            return result
+
+        service._write_batch = write_then_cancel
+        load = asyncio.create_task(service.load_fritzing_parts(force_reload=True, batch_size=2))
+        try:
+            await load
+        except asyncio.CancelledError:
+            pass
+        assert load.cancelled()
+
+        stored = await service.collection.distinct("id")
+        assert 0 < len(stored) < 6
+        assert service.search_index.ready
+        assert set(service.search_index.part_tokens) == set(stored)
+
+        # The next incremental load finds those parts unchanged and still sees them indexed
+        service._write_batch = write_batch
+        report = await service.load_fritzing_parts(incremental=True)
+        assert report.unchanged == len(stored)
+        assert set(service.search_index.part_tokens) == set(await service.collection.distinct("id"))
+
+    asyncio.run(run())
+
+def test_ingest_that_writes_nothing_skips_the_refresh(tmp_path):
+    async def run():
+        service = part_service(tmp_path, 2)
+        await service.load_fritzing_parts(force_reload=True)
+        revision = await service.revision.refresh()
+        report = await service.load_fritzing_parts(incremental=True)
+        assert report.unchanged == 2
+        assert await service.revision.refresh() == revision
+
+    asyncio.run(run())
+
+def test_incremental_ingest_updates_only_changed_parts_in_the_index(tmp_path):
+    async def run():
+        service = part_service(tmp_path, 4)
+        await service.load_fritzing_parts(force_reload=True)
+        assert service.search_index.ready
+        first, second = sorted((tmp_path / "core").glob("*.fzp"))[:2]
+        first.write_text(first.read_text().replace("<title>", "<title>Zyzzyva ", 1))
+        second.unlink()
+
+        async def rebuild():
+            raise AssertionError("index rebuilt from scratch")
+
+        service.refresh_search_index = rebuild
+        report = await service.load_fritzing_parts(incremental=True)
+        assert (report.updated, report.removed, report.unchanged) == (1, 1, 2)
+        stored = await service.collection.distinct("id")
+        assert set(service.search_index.part_tokens) == set(stored)
+        [changed] = service.search_index.search("zyzzyva")
+        assert (await service.collection.find_one({"id": changed}))["title"].startswith("Zyzzyva ")
+
+    asyncio.run(run())
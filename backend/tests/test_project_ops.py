@@ -0,0 +1,125 @@
+import asyncio
+import copy
+import random
+from datetime import datetime
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from models.project import PartInstance, Position, ProjectCreate, ProjectOps
+from services.project_ops import build_project_update
+from services.project_service import ProjectService
+
+def instance(instance_id, **fields):
+    return {"id": instance_id, "part_id": "resistor", "position": {"x": 0.0, "y": 0.0}, "rotation": 0.0, "properties": {}, **fields}
+
+def wire(wire_id, from_part, to_part):
+    return {
+        "id": wire_id, "from_part_id": from_part, "from_connector": "c0", "to_part_id": to_part, "to_connector": "c1",
+        "color": "#ff0000", "from_pos": None, "to_pos": None
+    }
+
+def ops(*items):
+    return ProjectOps(ops=list(items)).ops
+
+def apply_naively(document, op):
+    """Reference semantics: apply one operation to a plain project document"""
+    if op["op"] == "add_part":
+        document["parts"].append(op["part"])
+    elif op["op"] == "add_wire":
+        document["wires"].append(op["wire"])
+    elif op["op"] == "remove_wire":
+        document["wires"] = [w for w in document["wires"] if w["id"] != op["wire_id"]]
+    elif op["op"] == "remove_part":
+        document["parts"] = [p for p in document["parts"] if p["id"] != op["part_id"]]
+        document["wires"] = [w for w in document["wires"] if op["part_id"] not in (w["from_part_id"], w["to_part_id"])]
+    else:
+        part = next(p for p in document["parts"] if p["id"] == op["part_id"])
+        if op["op"] == "move_part":
+            part["position"] = op["position"]
+            if op.get("rotation") is not None:
+                part["rotation"] = op["rotation"]
+        elif op["value"] is None:
+            part["properties"].pop(op["key"], None)
+        else:
+            part["properties"][op["key"]] = op["value"]
+
+@pytest.mark.parametrize("batch, message", [
+    ([{"op": "move_part", "part_id": "nope", "position": {"x": 1, "y": 1}}], "unknown part instance nope"),
+    ([{"op": "add_part", "part": instance("a")}], "part instance a already exists"),
+    ([{"op": "add_wire", "wire": wire("w1", "a", "b")}], "wire w1 already exists"),
+    ([{"op": "remove_part", "part_id": "b"}, {"op": "remove_wire", "wire_id": "w1"}], "Operation 1: unknown wire w1"),
+    ([{"op": "set_property", "part_id": "a", "key": "$where", "value": "1"}], "Invalid property name"),
+])
+def test_invalid_batches_are_rejected(batch, message):
+    with pytest.raises(ValueError, match=message):
+        build_project_update(ops(*batch), {"a", "b"}, {"w1": ("a", "b")})
+
+def test_pipeline_matches_sequential_application():
+    async def run():
+        collection = AsyncMongoMockClient().db.projects
+        rng = random.Random(7)
+        for _ in range(300):
+            next_id = iter(range(1000))
+            document = {"parts": [instance(f"i{next(next_id)}", properties={"a": "0"}) for _ in range(rng.randint(0, 5))], "wires": []}
+            expected, batch = copy.deepcopy(document), []
+            for _ in range(rng.randint(1, 10)):
+                parts = [p["id"] for p in expected["parts"]]
+                wires = [w["id"] for w in expected["wires"]]
+                kinds = ["add_part"] + (["move_part", "remove_part", "set_property", "add_wire"] if parts else []) + (["remove_wire"] if wires else [])
+                kind = rng.choice(kinds)
+                if kind == "add_part":
+                    op = {"op": kind, "part": instance(f"i{next(next_id)}", part_id="led")}
+                elif kind == "move_part":
+                    op = {"op": kind, "part_id": rng.choice(parts), "position": {"x": float(rng.randint(0, 9)), "y": 1.0}, "rotation": rng.choice([None, 90.0])}
+                elif kind == "remove_part":
+                    op = {"op": kind, "part_id": rng.choice(parts)}
+                elif kind == "set_property":
+                    op = {"op": kind, "part_id": rng.choice(parts), "key": rng.choice(["a", "b"]), "value": rng.choice([None, "1", "$2"])}
+                elif kind == "add_wire":
+                    op = {"op": kind, "wire": wire(f"w{next(next_id)}", rng.choice(parts), rng.choice(parts))}
+                else:
+                    op = {"op": kind, "wire_id": rng.choice(wires)}
+                apply_naively(expected, copy.deepcopy(op))
+                batch.append(op)
+
+            update = build_project_update(
+                ops(*batch),
+                {p["id"] for p in document["parts"]},
+                {w["id"]: (w["from_part_id"], w["to_part_id"]) for w in document["wires"]}
+            )
+            await collection.delete_many({})
+            await collection.insert_one({"id": "p", "revision": 3, **copy.deepcopy(document), "content_hashes": {"name": "h", "parts": "h"}})
+            await collection.update_one({"id": "p", "revision": 3}, update.to_pipeline(datetime(2026, 1, 1)))
+            stored = await collection.find_one({"id": "p"}, {"_id": 0})
+            assert stored["parts"] == expected["parts"]
+            assert stored["wires"] == expected["wires"]
+            assert stored["revision"] == 4
+            assert (stored["part_count"], stored["wire_count"]) == (len(expected["parts"]), len(expected["wires"]))
+            assert stored["content_hashes"] == {"name": "h"}
+
+    asyncio.run(run())
+
+async def project_service():
+    collection = AsyncMongoMockClient().db.projects
+    service = ProjectService(collection)
+    await service.create_project(ProjectCreate(
+        name="mine",
+        parts=[PartInstance(**instance("a")), PartInstance(**instance("b"))],
+        wires=[wire("w1", "a", "b")]
+    ))
+    await collection.update_one({}, {"$set": {"id": "p"}})
+    return service, collection
+
+def test_move_and_property_edits_touch_only_their_instance():
+    async def run():
+        service, collection = await project_service()
+        result = await service.apply_ops("p", ops(
+            {"op": "move_part", "part_id": "a", "position": {"x": 5, "y": 6}, "rotation": 90},
+            {"op": "set_property", "part_id": "a", "key": "resistance", "value": "220Ω"},
+        ), expected_revision=0)
+        assert result.revision == 1
+        project = await service.get_project_by_id("p")
+        a, b = project.parts
+        assert (a.position, a.rotation, a.properties) == (Position(x=5, y=6), 90.0, {"resistance": "220Ω"})
+        assert b == PartInstance(**instance("b"))
+
+    asyncio.run(run())
@@ -0,0 +1,187 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import ReturnDocument
+from models.project import PartInstance, ProjectCreate, ProjectOps, ProjectUpdate
+from services.project_service import ProjectService, RevisionConflict
+import routers.projects as projects_router
+
+def instance(instance_id, **fields):
+    return {"id": instance_id, "part_id": "resistor", "position": {"x": 0.0, "y": 0.0}, "rotation": 0.0, "properties": {}, **fields}
+
+def wire(wire_id, from_part, to_part):
+    return {
+        "id": wire_id, "from_part_id": from_part, "from_connector": "c0", "to_part_id": to_part, "to_connector": "c1",
+        "color": "#ff0000", "from_pos": None, "to_pos": None
+    }
+
+def ops(*items):
+    return ProjectOps(ops=list(items)).ops
+
+class RacingCollection:
+    """A collection where another writer gets in right after each of the first reads"""
+
+    def __init__(self, collection, races=1, write=None):
+        self.collection = collection
+        self.races = races
+        self.write = write or (lambda: collection.update_one({"id": "p"}, {"$inc": {"revision": 1}, "$set": {"name": "theirs"}}))
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def find_one(self, *args, **kwargs):
+        document = await self.collection.find_one(*args, **kwargs)
+        if self.races:
+            self.races -= 1
+            await self.write()
+        return document
+
+async def project_service(**racing):
+    collection = AsyncMongoMockClient().db.projects
+    service = ProjectService(collection)
+    await service.create_project(ProjectCreate(
+        name="mine",
+        parts=[PartInstance(**instance("a")), PartInstance(**instance("b"))],
+        wires=[wire("w1", "a", "b")]
+    ))
+    await collection.update_one({}, {"$set": {"id": "p"}})
+    if racing:
+        service.collection = RacingCollection(collection, **racing)
+    return service, collection
+
+ADD_C = {"op": "add_part", "part": instance("c")}
+
+def test_stale_expected_revision_applies_nothing():
+    async def run():
+        service, collection = await project_service()
+        before = await collection.find_one({"id": "p"}, {"_id": 0})
+        with pytest.raises(RevisionConflict) as conflict:
+            await service.apply_ops("p", ops(ADD_C), expected_revision=5)
+        assert conflict.value.revision == 0
+        assert await collection.find_one({"id": "p"}, {"_id": 0}) == before
+
+        with pytest.raises(RevisionConflict):
+            await service.update_project("p", ProjectUpdate(name="new", expected_revision=5))
+        assert await collection.find_one({"id": "p"}, {"_id": 0}) == before
+
+    asyncio.run(run())
+
+def test_conflicting_write_between_read_and_write_applies_nothing():
+    async def run():
+        service, collection = await project_service(races=1)
+        with pytest.raises(RevisionConflict) as conflict:
+            await service.apply_ops("p", ops(ADD_C, {"op": "remove_part", "part_id": "a"}), expected_revision=0)
+        assert conflict.value.revision == 1
+        stored = await collection.find_one({"id": "p"}, {"_id": 0})
+        assert [p["id"] for p in stored["parts"]] == ["a", "b"]
+        assert [w["id"] for w in stored["wires"]] == ["w1"]
+        assert (stored["name"], stored["revision"]) == ("theirs", 1)
+
+    asyncio.run(run())
+
+def test_unconditional_batch_is_checked_again_after_a_concurrent_write():
+    async def run():
+        service, collection = await project_service(races=2)
+        result = await service.apply_ops("p", ops(ADD_C, {"op": "remove_wire", "wire_id": "w1"}))
+        assert (result.applied, result.revision) == (2, 3)
+        stored = await collection.find_one({"id": "p"}, {"_id": 0})
+        assert [p["id"] for p in stored["parts"]] == ["a", "b", "c"]
+        assert stored["wires"] == []
+        assert (stored["name"], stored["revision"], stored["part_count"]) == ("theirs", 3, 3)
+
+    asyncio.run(run())
+
+def test_batch_invalidated_by_a_concurrent_write_is_rejected():
+    async def run():
+        service, collection = await project_service()
+        racing = RacingCollection(collection, write=lambda: collection.update_one(
+            {"id": "p"}, {"$inc": {"revision": 1}, "$set": {"wires": []}}
+        ))
+        service.collection = racing
+        with pytest.raises(ValueError, match="unknown wire w1"):
+            await service.apply_ops("p", ops(ADD_C, {"op": "remove_wire", "wire_id": "w1"}))
+        stored = await collection.find_one({"id": "p"}, {"_id": 0})
+        assert [p["id"] for p in stored["parts"]] == ["a", "b"]
+
+    asyncio.run(run())
+
+def test_project_deleted_before_the_write_is_not_found():
+    async def run():
+        service, collection = await project_service(races=1, write=lambda: collection.delete_one({"id": "p"}))
+        assert await service.apply_ops("p", ops(ADD_C), expected_revision=0) is None
+        assert await collection.count_documents({}) == 0
+
+    asyncio.run(run())
+
+class ConditionalUpdateCollection:
+    """A collection whose find_one_and_update is a conditional update_one plus a read.
+
+    mongomock-motor's find_one_and_update returns None for the revision-filtered
+    $set/$inc update_project sends (real Mongo returns the document), which
+    would make every successful conditional save look like a conflict. The
+    filter is honoured the same way, so a missed revision still misses.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=ReturnDocument.BEFORE):
+        assert return_document == ReturnDocument.AFTER
+        result = await self.collection.update_one(query, update)
+        if not result.matched_count:
+            return None
+        return await self.collection.find_one({"id": query["id"]}, projection)
+
+async def saved_project_service():
+    service, collection = await project_service()
+    service.collection = ConditionalUpdateCollection(collection)
+    return service, collection
+
+def test_conditional_save_at_the_current_revision_is_written():
+    async def run():
+        service, collection = await saved_project_service()
+        project = await service.update_project("p", ProjectUpdate(name="new"), expected_revision=0)
+        assert (project.name, project.revision) == ("new", 1)
+        project = await service.update_project("p", ProjectUpdate(name="newer", expected_revision=1))
+        assert (project.name, project.revision) == ("newer", 2)
+        stored = await collection.find_one({"id": "p"}, {"_id": 0})
+        assert (stored["name"], stored["revision"]) == ("newer", 2)
+
+        # Saving the same content again writes nothing and keeps the revision
+        project = await service.update_project("p", ProjectUpdate(name="newer"), expected_revision=2)
+        assert project.revision == 2
+
+    asyncio.run(run())
+
+def test_conditional_save_raced_by_another_write_applies_nothing():
+    async def run():
+        service, collection = await saved_project_service()
+        service.collection = ConditionalUpdateCollection(RacingCollection(collection))
+        with pytest.raises(RevisionConflict) as conflict:
+            await service.update_project("p", ProjectUpdate(name="mine, edited"), expected_revision=0)
+        assert conflict.value.revision == 1
+        stored = await collection.find_one({"id": "p"}, {"_id": 0})
+        assert (stored["name"], stored["revision"]) == ("theirs", 1)
+
+    asyncio.run(run())
+
+def test_put_with_if_match():
+    service, _ = asyncio.run(saved_project_service())
+    app = FastAPI()
+    app.include_router(projects_router.router)
+    app.dependency_overrides[projects_router.get_project_service] = lambda: service
+    client = TestClient(app)
+
+    response = client.put("/projects/p", json={"name": "new"}, headers={"If-Match": '"0"'})
+    assert response.status_code == 200
+    assert (response.json()["revision"], response.headers["ETag"]) == (1, '"1"')
+
+    response = client.put("/projects/p", json={"name": "stale"}, headers={"If-Match": '"0"'})
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"1"'
+    assert client.get("/projects/p").json()["name"] == "new"
@@ -0,0 +1,54 @@
+import pytest
+from services.svg_geometry import parse_svg_document, parse_transform
+
+def svg(attributes, body):
+    return f'<svg xmlns="http://www.w3.org/2000/svg" {attributes}>{body}</svg>'.encode()
+
+def box(attributes, body, element_id="c"):
+    document = parse_svg_document(svg(attributes, body))
+    return tuple(round(value, 4) for value in document.element_box(element_id))
+
+@pytest.mark.parametrize("attributes, size", [
+    ('width="1in" height="0.5in"', (96.0, 48.0)),
+    ('width="25.4mm" height="2.54cm"', (96.0, 96.0)),
+    ('width="72pt" height="6pc"', (96.0, 96.0)),
+    ('width="30" height="20px"', (30.0, 20.0)),
+    ('width="2in" viewBox="0 0 100 50"', (192.0, 96.0)),
+    ('height="2in" viewBox="0 0 100 50"', (384.0, 192.0)),
+    ('viewBox="0 0 100 50"', (100.0, 50.0)),
+    ('width="100%" height="100%"', (0.0, 0.0)),
+])
+def test_document_size_in_pixels(attributes, size):
+    document = parse_svg_document(svg(attributes, ''))
+    assert (round(document.width, 4), round(document.height, 4)) == size
+
+def test_view_box_maps_to_pixels():
+    # 1in = 96px across 200 user units: 0.48px per unit, from the viewBox origin
+    assert box('width="1in" height="0.5in" viewBox="100 50 200 100"', '<rect id="c" x="100" y="50" width="20" height="10"/>') == (0.0, 0.0, 9.6, 4.8)
+    assert box('width="1in" height="0.5in" viewBox="100 50 200 100"', '<circle id="c" cx="300" cy="150" r="4"/>') == (94.08, 46.08, 97.92, 49.92)
+
+def test_mismatched_aspect_ratio_is_centered():
+    # 96 x 37.8px viewport, 200 x 100 viewBox: uniform scale 0.378, centred horizontally
+    assert box('width="1in" height="10mm" viewBox="100 50 200 100"', '<rect id="c" x="100" y="50" width="200" height="100"/>') == (10.2047, 0.0, 85.7953, 37.7953)
+
+def test_ancestor_transforms_apply_in_order():
+    body = '<g transform="translate(10 20)"><g transform="scale(2)"><rect id="c" x="1" y="1" width="2" height="3"/></g></g>'
+    assert box('width="100" height="100"', body) == (12.0, 22.0, 16.0, 28.0)
+
+def test_rotation_covers_every_corner():
+    body = '<g transform="rotate(90 10 10)"><rect id="c" x="10" y="10" width="4" height="2"/></g>'
+    assert box('width="100" height="100"', body) == (8.0, 10.0, 10.0, 14.0)
+
+def test_group_and_path_extents():
+    body = '<g id="c"><path d="M 1 1 h 4 v 2"/><line x1="0" y1="9" x2="3" y2="9"/></g>'
+    assert box('width="10" height="10"', body) == (0.0, 1.0, 5.0, 9.0)
+
+def test_parse_transform():
+    assert parse_transform('translate(5) scale(2 3)') == (2.0, 0.0, 0.0, 3.0, 5.0, 0.0)
+    assert parse_transform('matrix(1 2 3 4 5 6)') == (1.0, 2.0, 3.0, 4.0, 5.0, 6.0)
+    assert parse_transform(None) == (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+def test_unknown_elements_have_no_box():
+    document = parse_svg_document(svg('width="10" height="10"', '<rect id="c"/>'))
+    assert document.element_box("missing") is None
+    assert parse_svg_document(b'<svg') is None
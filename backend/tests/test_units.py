@@ -0,0 +1,57 @@
+import pytest
+from services.units import build_range_query, numeric_properties, parse_quantity, parse_range
+
+@pytest.mark.parametrize("text, expected", [
+    ("4.7kΩ", (4700.0, "Ω")),
+    ("4.7KOhm", (4700.0, "Ω")),
+    ("220 ohms", (220.0, "Ω")),
+    ("100nF", (1e-07, "F")),
+    ("0.1µF", (1e-07, "F")),
+    ("10uH", (1e-05, "H")),
+    ("5V", (5.0, "V")),
+    ("12vdc", (12.0, "V")),
+    ("1MHz", (1e6, "Hz")),
+    ("0.5W", (0.5, "W")),
+    ("10M", (1e7, None)),
+    ("2.54mm", (0.00254, "m")),
+    ("0.1in", (0.00254, "m")),
+    ("0.1IN", (0.00254, "m")),
+    ("100mil", (0.00254, "m")),
+    ("100 MIL", (0.00254, "m")),
+    ("330Ω ±5%", (330.0, "Ω")),
+    ("0.1in (2.54mm)", (0.00254, "m")),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
+
+@pytest.mark.parametrize("text", ["", None, "red", "3-17V", "3.3V / 5V", "1MM", "1Mm", "1CM", "100NF"])
+def test_parse_quantity_rejects(text):
+    assert parse_quantity(text) is None
+
+def test_prefixes_are_case_sensitive():
+    assert parse_quantity("1mhz") == (0.001, "Hz")
+    assert parse_quantity("1MHz") == (1e6, "Hz")
+    assert parse_quantity("1m") == (0.001, None)
+
+def test_equal_quantities_normalize_equal():
+    assert parse_quantity("0.1µF") == parse_quantity("100nF")
+
+def test_numeric_properties_skip_mismatched_units():
+    values = numeric_properties({"Resistance": "220Ω", "voltage": "5A", "color": "red", "package": "0.3in"})
+    assert values == [{"name": "resistance", "value": 220.0}, {"name": "package", "value": 0.00762}]
+
+def test_parse_range():
+    assert parse_range("capacitance>=10nF") == ("capacitance", "$gte", 1e-08)
+    assert parse_range("Pin Spacing = 0.1in") == ("pin spacing", "$eq", 0.00254)
+    with pytest.raises(ValueError):
+        parse_range("capacitance>=5V")
+    with pytest.raises(ValueError):
+        parse_range("capacitance")
+
+def test_build_range_query_merges_bounds():
+    query = build_range_query(["resistance>=1k", "resistance<10k", "voltage<=5V"])
+    assert query == {"$and": [
+        {"numeric_properties": {"$elemMatch": {"name": "resistance", "value": {"$gte": 1000.0, "$lt": 10000.0}}}},
+        {"numeric_properties": {"$elemMatch": {"name": "voltage", "value": {"$lte": 5.0}}}}
+    ]}
+    assert build_range_query([]) == {}
@@ -44,9 +44,18 @@ const FritzingEditor = () => {
       await updateProject(currentProject.id, {
         parts: updatedProject.parts,
         wires: updatedProject.wires,
-        canvas_settings: updatedProject.canvas_settings
+        canvas_settings: updatedProject.canvas_settings,
+        expected_revision: currentProject.revision
       });
     } catch (error) {
+      if (error.response?.status === 409) {
+        toast({
+          title: "Project Changed",
+          description: "This project was saved elsewhere; reloaded the latest version",
+          variant: "destructive"
+        });
+        return;
+      }
       console.error('Failed to update project:', error);
       // Don't show error toast as the app has fallback mechanisms
     }
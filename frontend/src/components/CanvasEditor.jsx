@@ -6,6 +6,7 @@ import { useToast } from '../hooks/use-toast';
 import PartRenderer from './PartRenderer';
 import WireConnector from './WireConnector';
 import { saveProject } from '../utils/mockData';
+import { partsApi } from '../services/api';
 
 const GRID_SIZE = 20;
 const SNAP_THRESHOLD = 10;
@@ -146,7 +147,7 @@ const CanvasEditor = ({ project, onProjectUpdate, className }) => {
   }, [dragState]);
 
   // Handle drop from parts library
-  const handleDrop = useCallback((event) => {
+  const handleDrop = useCallback(async (event) => {
     event.preventDefault();
     const rect = canvasRef.current?.getBoundingClientRect();
     if (!rect) return;
@@ -155,7 +156,11 @@ const CanvasEditor = ({ project, onProjectUpdate, className }) => {
     const y = (event.clientY - rect.top - pan.y) / zoom;
 
     try {
-      const partData = JSON.parse(event.dataTransfer.getData('application/json'));
+      let partData = JSON.parse(event.dataTransfer.getData('application/json'));
+      // The library lists part summaries; fetch the connectors and views before placing
+      if (!partData.connectors) {
+        partData = await partsApi.getPartById(partData.id);
+      }
       const newPart = {
         id: `part-${Date.now()}`,
         partId: partData.id,
@@ -6,6 +6,10 @@ import { ScrollArea } from './ui/scroll-area';
 import { Button } from './ui/button';
 import { useParts } from '../hooks/useParts';
 import { useToast } from '../hooks/use-toast';
+import { partImageUrl } from '../services/api';
+
+// Summaries from the API carry a count; full parts (offline data) carry the connectors
+const connectorCount = (part) => part.connector_count ?? part.connectors?.length ?? 0;
 
 const PartLibrary = ({ onPartSelect, className }) => {
   const { toast } = useToast();
@@ -176,7 +180,7 @@ const PartLibrary = ({ onPartSelect, className }) => {
                 <div className="w-12 h-12 bg-white rounded border border-gray-200 flex items-center justify-center overflow-hidden">
                   {part.image_path ? (
                     <img
-                      src={part.image_path}
+                      src={partImageUrl(part.image_path)}
                       alt={part.title}
                       className="max-w-full max-h-full object-contain"
                       style={{ width: '40px', height: '40px' }}
@@ -217,9 +221,9 @@ const PartLibrary = ({ onPartSelect, className }) => {
                     </div>
                   )}
                   
-                  {part.connectors && part.connectors.length > 0 && (
+                  {connectorCount(part) > 0 && (
                     <div className="text-xs text-gray-500 mt-1">
-                      {part.connectors.length} connector{part.connectors.length !== 1 ? 's' : ''}
+                      {connectorCount(part)} connector{connectorCount(part) !== 1 ? 's' : ''}
                     </div>
                   )}
                 </div>
@@ -1,5 +1,5 @@
 import React, { useEffect, useRef, useState } from 'react';
-import { loadSvgWithConnectors } from '../utils/parseFzp';
+import { loadSvg, loadSvgWithConnectors } from '../utils/parseFzp';
 
 const PartRenderer = ({ 
   part, 
@@ -16,6 +16,10 @@ const PartRenderer = ({
   const [error, setError] = useState(null);
   const svgRef = useRef(null);
 
+  // Positions resolved at ingest time make parsing connectors out of the SVG unnecessary
+  const hasGeometry = Boolean(part.connectors?.length) &&
+    part.connectors.every(connector => connector.geometry?.breadboard);
+
   useEffect(() => {
     const loadSvg = async () => {
       try {
@@ -23,7 +27,9 @@ const PartRenderer = ({
         setError(null);
         
         if (part.imagePath) {
-          const data = await loadSvgWithConnectors(part.imagePath);
+          const data = hasGeometry
+            ? await loadSvg(part.imagePath)
+            : await loadSvgWithConnectors(part.imagePath);
           setSvgData(data);
         }
       } catch (err) {
@@ -35,7 +41,17 @@ const PartRenderer = ({
     };
 
     loadSvg();
-  }, [part.imagePath]);
+  }, [part.imagePath, hasGeometry]);
+
+  // Prefer positions resolved at ingest time; fall back to the ones parsed from the SVG
+  const getConnectorPosition = (connector) => {
+    const geometry = connector.geometry?.breadboard;
+    if (geometry) {
+      return geometry.terminal || geometry.center;
+    }
+    return svgData?.connectorPositions?.[connector.terminalId] || 
+           svgData?.connectorPositions?.[connector.svgId];
+  };
 
   const handleConnectorClick = (connector, event) => {
     if (onConnectorClick) {
@@ -43,9 +59,7 @@ const PartRenderer = ({
       
       // Calculate global connector position
       const rect = svgRef.current?.getBoundingClientRect();
-      const connectorPos = svgData?.connectorPositions[connector.terminalId] || 
-                          svgData?.connectorPositions[connector.svgId] ||
-                          { x: 0, y: 0 };
+      const connectorPos = getConnectorPosition(connector) || { x: 0, y: 0 };
       
       const globalPos = {
         x: position.x + (connectorPos.x * scale),
@@ -107,11 +121,10 @@ const PartRenderer = ({
       />
       
       {/* Connectors overlay */}
-      {showConnectors && svgData.connectorPositions && (
+      {showConnectors && (hasGeometry || svgData.connectorPositions) && (
         <div className="absolute inset-0 pointer-events-none">
           {part.connectors?.map(connector => {
-            const connectorPos = svgData.connectorPositions[connector.terminalId] || 
-                                svgData.connectorPositions[connector.svgId];
+            const connectorPos = getConnectorPosition(connector);
             
             if (!connectorPos) return null;
             
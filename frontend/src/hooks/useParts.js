@@ -2,6 +2,8 @@ import { useState, useEffect, useCallback } from 'react';
 import { partsApi } from '../services/api';
 import { mockParts } from '../utils/mockData';
 
+const INGEST_POLL_INTERVAL = 1000;
+
 export const useParts = () => {
   const [parts, setParts] = useState([]);
   const [families, setFamilies] = useState(['all']);
@@ -13,7 +15,8 @@ export const useParts = () => {
       setLoading(true);
       setError(null);
       
-      const fetchedParts = await partsApi.getParts(params);
+      // The library only lists parts; full parts are fetched when dropped on the canvas
+      const fetchedParts = await partsApi.getParts({ view: 'summary', ...params });
       
       // If no parts returned from backend, use mock data as fallback
       if (fetchedParts && fetchedParts.length > 0) {
@@ -83,9 +86,17 @@ export const useParts = () => {
   const loadFritzingParts = useCallback(async (forceReload = false) => {
     try {
       setLoading(true);
-      const result = await partsApi.loadFritzingParts(forceReload);
+      // Reloads run as a background job on the server; poll until it finishes
+      let job = await partsApi.startIngestJob({ force_reload: forceReload });
+      while (job.status === 'pending' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, INGEST_POLL_INTERVAL));
+        job = await partsApi.getIngestJob(job.id);
+      }
+      if (job.status !== 'completed') {
+        throw new Error(job.error || `Fritzing parts reload ${job.status}`);
+      }
       await loadParts(); // Reload parts after loading from Fritzing
-      return result;
+      return job.report;
     } catch (err) {
       console.error('Failed to load Fritzing parts:', err);
       throw err;
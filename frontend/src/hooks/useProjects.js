@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { projectsApi } from '../services/api';
 import { mockProjects, saveProject as saveMockProject, getProjects as getMockProjects } from '../utils/mockData';
 
@@ -7,13 +7,17 @@ export const useProjects = () => {
   const [currentProject, setCurrentProject] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Saves go out one at a time, each conditional on the revision the last one returned
+  const saveQueue = useRef(Promise.resolve());
+  const revisions = useRef({});
 
   const loadProjects = useCallback(async (params = {}) => {
     try {
       setLoading(true);
       setError(null);
       
-      const fetchedProjects = await projectsApi.getProjects(params);
+      // The list only needs names, counts and dates, not every part and wire
+      const fetchedProjects = await projectsApi.getProjects({ view: 'summary', ...params });
       
       // If no projects returned from backend, use mock data as fallback
       if (fetchedProjects && fetchedProjects.length > 0) {
@@ -74,9 +78,22 @@ export const useProjects = () => {
     }
   }, []);
 
+  const saveProject = useCallback((projectId, projectData) => {
+    const save = saveQueue.current.catch(() => {}).then(async () => {
+      const updatedProject = await projectsApi.updateProject(projectId, {
+        ...projectData,
+        expected_revision: revisions.current[projectId] ?? projectData.expected_revision
+      });
+      revisions.current[projectId] = updatedProject.revision;
+      return updatedProject;
+    });
+    saveQueue.current = save;
+    return save;
+  }, []);
+
   const updateProject = useCallback(async (projectId, projectData) => {
     try {
-      const updatedProject = await projectsApi.updateProject(projectId, projectData);
+      const updatedProject = await saveProject(projectId, projectData);
       setProjects(prev => prev.map(project => 
         project.id === projectId ? updatedProject : project
       ));
@@ -85,6 +102,12 @@ export const useProjects = () => {
       }
       return updatedProject;
     } catch (err) {
+      if (err.response?.status === 409) {
+        // Saved elsewhere since we loaded it; take the latest version rather than overwrite it
+        delete revisions.current[projectId];
+        await loadProject(projectId);
+        throw err;
+      }
       console.error('Failed to update project, using fallback:', err);
       // Fallback to mock storage
       const updatedProject = {
@@ -101,7 +124,7 @@ export const useProjects = () => {
       }
       return updatedProject;
     }
-  }, [currentProject]);
+  }, [currentProject, saveProject, loadProject]);
 
   const deleteProject = useCallback(async (projectId) => {
     try {
@@ -37,6 +37,10 @@ apiClient.interceptors.response.use(
 );
 
 // Parts API
+// Part images are static files, except SVGs bundled in .fzpz parts, which the backend serves
+export const partImageUrl = (imagePath) =>
+  imagePath && imagePath.startsWith('/api/') ? `${BACKEND_URL}${imagePath}` : imagePath;
+
 export const partsApi = {
   // Get all parts
   getParts: async (params = {}) => {
@@ -56,6 +60,12 @@ export const partsApi = {
     return response.data;
   },
 
+  // Get many parts by ID or module ID
+  getPartsBatch: async (ids) => {
+    const response = await apiClient.post('/parts/batch', ids);
+    return response.data;
+  },
+
   // Create part
   createPart: async (partData) => {
     const response = await apiClient.post('/parts', partData);
@@ -74,11 +84,21 @@ export const partsApi = {
     return response.data;
   },
 
-  // Load Fritzing parts
-  loadFritzingParts: async (forceReload = false) => {
-    const response = await apiClient.post('/parts/load-fritzing-parts', null, {
-      params: { force_reload: forceReload }
-    });
+  // Start a background Fritzing parts reload
+  startIngestJob: async (params = {}) => {
+    const response = await apiClient.post('/parts/ingest-jobs', null, { params });
+    return response.data;
+  },
+
+  // Get ingest job progress
+  getIngestJob: async (jobId) => {
+    const response = await apiClient.get(`/parts/ingest-jobs/${jobId}`);
+    return response.data;
+  },
+
+  // Cancel ingest job
+  cancelIngestJob: async (jobId) => {
+    const response = await apiClient.post(`/parts/ingest-jobs/${jobId}/cancel`);
     return response.data;
   },
 };
@@ -109,6 +129,29 @@ export const projectsApi = {
     return response.data;
   },
 
+  // Apply granular edits (add/move/remove parts and wires, set properties)
+  applyProjectOps: async (projectId, ops, expectedRevision = null) => {
+    const response = await apiClient.patch(`/projects/${projectId}/ops`, {
+      ops,
+      expected_revision: expectedRevision
+    });
+    return response.data;
+  },
+
+  // Get the electrical nets of a project
+  getProjectNetlist: async (projectId) => {
+    const response = await apiClient.get(`/projects/${projectId}/netlist`);
+    return response.data;
+  },
+
+  // Get the part instances and wires overlapping a canvas region
+  getProjectViewport: async (projectId, { minX, minY, maxX, maxY }) => {
+    const response = await apiClient.get(`/projects/${projectId}/viewport`, {
+      params: { bbox: [minX, minY, maxX, maxY].join(',') }
+    });
+    return response.data;
+  },
+
   // Delete project
   deleteProject: async (projectId) => {
     const response = await apiClient.delete(`/projects/${projectId}`);
@@ -97,6 +97,17 @@ export const parseFzpFile = async (fzpPath) => {
   }
 };
 
+// Load SVG content only, for parts whose connector positions came with the part
+export const loadSvg = async (svgPath) => {
+  try {
+    const response = await fetch(svgPath);
+    return { svgContent: await response.text() };
+  } catch (error) {
+    console.error('Error loading SVG:', error);
+    throw new Error(`Failed to load SVG: ${error.message}`);
+  }
+};
+
 // Load SVG content and extract connector positions
 export const loadSvgWithConnectors = async (svgPath) => {
   try {